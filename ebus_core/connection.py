@@ -272,6 +272,37 @@ class SerialConnection:
             if not telegrams:
                 time.sleep(0.01)
 
+    def telegram_batch_generator(
+        self,
+        max_batch: int = 32,
+        max_wait_s: float = 0.1,
+    ) -> Generator[List[EbusTelegram], None, None]:
+        """
+        Yield telegrams in lists of at most max_batch.
+        A partial batch is flushed once its oldest telegram has waited max_wait_s.
+        """
+        batch: List[EbusTelegram] = []
+        flush_at = 0.0
+        while self.connected:
+            telegrams = self.read_telegrams()
+            if telegrams:
+                if not batch:
+                    flush_at = time.monotonic() + max_wait_s
+                batch.extend(telegrams)
+
+            while len(batch) >= max_batch:
+                yield batch[:max_batch]
+                batch = batch[max_batch:]
+
+            if batch and time.monotonic() >= flush_at:
+                yield batch
+                batch = []
+            elif not telegrams:
+                time.sleep(0.01)
+
+        if batch:
+            yield batch
+
 
 def create_connection(config: ConnectionConfig) -> SerialConnection:
     return SerialConnection(config)
@@ -3,33 +3,28 @@
 from typing import Union
 
 
+def _build_table(polynomial: int) -> bytes:
+    table = bytearray(256)
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ polynomial) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+        table[byte] = crc
+    return bytes(table)
+
+
 class EbusCRC:
     """CRC-8 calculator for eBus protocol."""
 
     POLYNOMIAL = 0x9B
-    _table: list = None
-
-    @classmethod
-    def _init_table(cls) -> list:
-        if cls._table is not None:
-            return cls._table
-
-        table = []
-        for byte in range(256):
-            crc = byte
-            for _ in range(8):
-                if crc & 0x80:
-                    crc = ((crc << 1) ^ cls.POLYNOMIAL) & 0xFF
-                else:
-                    crc = (crc << 1) & 0xFF
-            table.append(crc)
-
-        cls._table = table
-        return table
+    _TABLE = _build_table(POLYNOMIAL)
 
     @classmethod
     def calculate(cls, data: Union[bytes, bytearray]) -> int:
-        table = cls._init_table()
+        table = cls._TABLE
         crc = 0
         for byte in data:
             crc = table[crc ^ byte]
@@ -318,11 +318,11 @@ def main():
             loop_now = time.monotonic()
 
             if _bridge_paused_for_adapter_reset(state, loop_now):
-                time.sleep(MAIN_LOOP_SLEEP_SECONDS)
+                mqtt_client.poll(MAIN_LOOP_SLEEP_SECONDS)
                 continue
 
             if not _ensure_serial_connection(connection, logger, state, loop_now):
-                time.sleep(MAIN_LOOP_SLEEP_SECONDS)
+                mqtt_client.poll(MAIN_LOOP_SLEEP_SECONDS)
                 continue
 
             _run_maintenance_cycle(
@@ -335,7 +335,7 @@ def main():
                 logger,
                 loop_now,
             )
-            time.sleep(MAIN_LOOP_SLEEP_SECONDS)
+            mqtt_client.poll(MAIN_LOOP_SLEEP_SECONDS)
 
     except KeyboardInterrupt:
         logger.info("Stopping...")
@@ -5,6 +5,7 @@ Debug script to find outdoor temperature and pressure bytes.
 
 import sys
 import os
+import struct
 import time
 from datetime import datetime
 from collections import defaultdict
@@ -14,6 +15,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ebus_core.connection import SerialConnection, ConnectionConfig
 from ebus_core.telegram import EbusTelegram
 
+_S16_LE = struct.Struct("<h")
+
 
 def format_bytes(data: bytes, highlight_positions: list = None) -> str:
     """Format bytes with position markers."""
@@ -34,6 +37,23 @@ def format_bytes(data: bytes, highlight_positions: list = None) -> str:
     return f"Pos: {positions}\nHex: {hex_str}"
 
 
+def _decode_resp(resp: bytes, limit: int) -> tuple:
+    """Split the first ``limit`` bytes into (raw, ÷2, ÷10) columns."""
+    raw = resp[:limit]
+    return raw, [b / 2 for b in raw], [b / 10 for b in raw]
+
+
+def _decode_s16(resp: bytes, aligned: bool) -> tuple:
+    """Signed LE int16 candidates as (offsets, values, values ÷ 256) columns."""
+    if aligned:
+        values = [val for val, in struct.iter_unpack("<h", resp[:len(resp) & ~1])]
+        offsets = range(0, 2 * len(values), 2)
+    else:
+        offsets = range(0, len(resp) - 1)
+        values = [_S16_LE.unpack_from(resp, i)[0] for i in offsets]
+    return offsets, values, [val / 256.0 for val in values]
+
+
 def analyze_b511(telegram: EbusTelegram) -> None:
     """Analyze B511 message in detail."""
     query_type = telegram.data[0] if telegram.data else -1
@@ -51,23 +71,23 @@ def analyze_b511(telegram: EbusTelegram) -> None:
 
         print(f"\nDecoded values (trying different methods):")
 
-        for i in range(min(len(resp), 9)):
-            val = resp[i]
+        raw, div2, div10 = _decode_resp(resp, 9)
+        for i, val in enumerate(raw):
             print(f"  byte[{i}] = {val:3d} (0x{val:02X})")
-            print(f"         ÷2 = {val / 2:.1f}°C")
-            print(f"         ÷10 = {val / 10:.1f} bar")
+            print(f"         ÷2 = {div2[i]:.1f}°C")
+            print(f"         ÷10 = {div10[i]:.1f} bar")
             if val != 255:
                 print(f"         (valid)")
             else:
                 print(f"         (0xFF = N/A)")
 
-        # Try 16-bit values
+        # Try 16-bit values; the unsigned view is the same word masked.
         print(f"\n  16-bit combinations:")
-        for i in range(0, len(resp) - 1, 2):
-            val_le = int.from_bytes(resp[i:i + 2], 'little', signed=True)
-            val_ue = int.from_bytes(resp[i:i + 2], 'little', signed=False)
+        offsets, words, temps = _decode_s16(resp, aligned=True)
+        for i, val_le, temp in zip(offsets, words, temps):
+            val_ue = val_le & 0xFFFF
             print(f"  bytes[{i}:{i + 2}] = {val_le} signed, {val_ue} unsigned")
-            print(f"              ÷256 = {val_le / 256:.2f}°C (signed)")
+            print(f"              ÷256 = {temp:.2f}°C (signed)")
 
 
 def analyze_b504(telegram: EbusTelegram) -> None:
@@ -86,21 +106,20 @@ def analyze_b504(telegram: EbusTelegram) -> None:
 
         print(f"\nDecoded values:")
 
-        for i in range(min(len(resp), 10)):
-            val = resp[i]
+        raw, div2, div10 = _decode_resp(resp, 10)
+        for i, val in enumerate(raw):
             print(f"  byte[{i}] = {val:3d} (0x{val:02X})", end="")
             if i == 0:
                 print(f"  ← Modulation? {val}%")
             elif val == 255:
                 print(f"  ← 0xFF (N/A)")
             else:
-                print(f"  ÷2={val / 2:.1f}°C  ÷10={val / 10:.1f}bar")
+                print(f"  ÷2={div2[i]:.1f}°C  ÷10={div10[i]:.1f}bar")
 
         # Try outdoor temp in different positions
         print(f"\n  Outdoor temp candidates (signed int16 ÷ 256):")
-        for i in range(0, len(resp) - 1):
-            val = int.from_bytes(resp[i:i + 2], 'little', signed=True)
-            temp = val / 256.0
+        offsets, words, temps = _decode_s16(resp, aligned=False)
+        for i, val, temp in zip(offsets, words, temps):
             if -40 <= temp <= 50:
                 print(f"    bytes[{i}:{i + 2}] = {val} → {temp:.1f}°C ✓")
             else:
@@ -3,8 +3,8 @@
 Debug capture - shows raw bytes and parsing attempts.
 """
 
+import selectors
 import serial
-import time
 from datetime import datetime
 
 
@@ -33,10 +33,17 @@ def main():
     buffer = bytearray()
     count = 0
 
+    # Block in the kernel until the UART has bytes instead of polling every 10 ms.
+    selector = selectors.DefaultSelector()
+    selector.register(ser.fileno(), selectors.EVENT_READ)
+
     try:
         while count < 50:
-            if ser.in_waiting:
-                data = ser.read(ser.in_waiting)
+            if not selector.select(timeout=1.0):
+                continue
+
+            data = ser.read(ser.in_waiting or 1)
+            if data:
                 buffer.extend(data)
 
                 # Extract telegrams between SYNC bytes
@@ -52,7 +59,7 @@ def main():
                             ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
 
                             # Raw hex
-                            raw_hex = ' '.join(f'{b:02X}' for b in telegram)
+                            raw_hex = telegram.hex(' ').upper()
 
                             # Parse header
                             src = telegram[0]
@@ -91,11 +98,10 @@ def main():
                     while len(buffer) > 0 and buffer[0] == SYNC:
                         buffer.pop(0)
 
-            time.sleep(0.01)
-
     except KeyboardInterrupt:
         print("\n\nInterrupted")
     finally:
+        selector.close()
         ser.close()
 
     print("\n" + "=" * 80)
@@ -58,15 +58,14 @@ Monitor all temperature-like values to find the tank sensor.
 
     try:
         for telegram in connection.telegram_generator():
-            cmd = f"{telegram.primary_command:02X}{telegram.secondary_command:02X}"
-            data = telegram.data or b''
             resp = telegram.response_data or b''
 
             if not resp or len(resp) < 2:
                 continue
 
             count += 1
-            ts = datetime.now().strftime("%H:%M:%S")
+            cmd = f"{telegram.primary_command:02X}{telegram.secondary_command:02X}"
+            data = telegram.data or b''
 
             # Create message key
             query_byte = data[0] if data else 0xFF
@@ -95,6 +94,7 @@ Monitor all temperature-like values to find the tank sensor.
 
             # Print status every 10 seconds
             if time.time() - last_print > 10:
+                ts = datetime.now().strftime("%H:%M:%S")
                 print(f"\n[{ts}] Monitored {count} messages...")
                 print("Current temperature-like values:")
 
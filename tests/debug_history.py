@@ -5,12 +5,29 @@ Discover historical data commands (gas consumption, burner hours, etc.)
 
 import sys
 import os
+import struct
 import time
-from datetime import datetime
+from collections import OrderedDict
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ebus_core.connection import SerialConnection, ConnectionConfig
+from timefmt import hms
+
+
+# Commands we're interested in
+TARGET_CMDS = frozenset({
+    (0xB5, 0x12),  # Possibly counters/statistics
+    (0xB5, 0x13),  # Possibly history/logs
+    (0xB5, 0x14),  # Possibly schedules/programs
+    (0xB5, 0x15),  # Possibly error history
+    (0xB5, 0x17),  # Possibly more stats
+    (0xB5, 0x18),  # Possibly more stats
+    (0xB5, 0x19),  # Possibly more stats
+    (0xB5, 0x1A),  # Possibly more stats
+})
+
+MAX_PATTERNS = 256
 
 
 def analyze_response(cmd: str, query_data: bytes, resp: bytes) -> dict:
@@ -22,7 +39,8 @@ def analyze_response(cmd: str, query_data: bytes, resp: bytes) -> dict:
         "decoded": {}
     }
 
-    if not resp:
+    # Idle/unknown responses are all 0xFF and decode to nothing
+    if not resp or resp.count(0xFF) == len(resp):
         return result
 
     # Try different decodings
@@ -34,16 +52,14 @@ def analyze_response(cmd: str, query_data: bytes, resp: bytes) -> dict:
             decoded[f"byte[{i}]"] = b
 
     # 16-bit values (counters are often 16 or 32 bit)
-    for i in range(0, len(resp) - 1, 2):
-        val = int.from_bytes(resp[i:i + 2], 'little')
+    for i, (val,) in enumerate(struct.iter_unpack("<H", resp[:len(resp) & ~1])):
         if val != 0xFFFF and val != 0:
-            decoded[f"uint16[{i}]"] = val
+            decoded[f"uint16[{i * 2}]"] = val
 
     # 32-bit values (for large counters like gas consumption)
-    for i in range(0, len(resp) - 3, 4):
-        val = int.from_bytes(resp[i:i + 4], 'little')
+    for i, (val,) in enumerate(struct.iter_unpack("<I", resp[:len(resp) & ~3])):
         if val != 0xFFFFFFFF and val != 0:
-            decoded[f"uint32[{i}]"] = val
+            decoded[f"uint32[{i * 4}]"] = val
 
     return result
 
@@ -66,20 +82,8 @@ def main():
 
     print("✅ Connected!\n")
 
-    # Commands we're interested in
-    target_cmds = {
-        "B512": "Possibly counters/statistics",
-        "B513": "Possibly history/logs",
-        "B514": "Possibly schedules/programs",
-        "B515": "Possibly error history",
-        "B517": "Possibly more stats",
-        "B518": "Possibly more stats",
-        "B519": "Possibly more stats",
-        "B51A": "Possibly more stats",
-    }
-
-    # Also look for these patterns (common for statistics)
-    interesting_patterns = {}
+    # Also look for these patterns (common for statistics); LRU-bounded so long runs stay small
+    interesting_patterns = OrderedDict()
 
     count = 0
     start_time = time.time()
@@ -87,40 +91,48 @@ def main():
     try:
         for telegram in connection.telegram_generator():
             count += 1
-            cmd = f"{telegram.primary_command:02X}{telegram.secondary_command:02X}"
+            key = (telegram.primary_command, telegram.secondary_command)
             data = telegram.data or b''
             resp = telegram.response_data or b''
 
-            ts = datetime.now().strftime("%H:%M:%S")
+            ts = hms(time.time())
 
             # Check if this is an interesting command
-            if cmd in target_cmds or cmd.startswith("B5"):
-                analysis = analyze_response(cmd, data, resp)
+            if key in TARGET_CMDS or key[0] == 0xB5:
+                cmd = f"{key[0]:02X}{key[1]:02X}"
 
                 # Skip if we've seen this exact pattern
                 pattern_key = f"{cmd}_{data.hex()}"
                 if pattern_key in interesting_patterns:
+                    interesting_patterns.move_to_end(pattern_key)
                     interesting_patterns[pattern_key]["count"] += 1
                     continue
 
+                analysis = analyze_response(cmd, data, resp)
                 interesting_patterns[pattern_key] = {
                     "count": 1,
                     "analysis": analysis
                 }
+                if len(interesting_patterns) > MAX_PATTERNS:
+                    interesting_patterns.popitem(last=False)
 
-                print(f"\n[{count:4d}] {ts} Command: {cmd}")
-                print(f"       Query: {data.hex() if data else '(none)'}")
-                print(f"       Response ({len(resp)} bytes): {resp.hex() if resp else '(none)'}")
+                lines = []
+                out = lines.append
+                out(f"\n[{count:4d}] {ts} Command: {cmd}")
+                out(f"       Query: {data.hex() if data else '(none)'}")
+                out(f"       Response ({len(resp)} bytes): {resp.hex() if resp else '(none)'}")
 
                 if analysis["decoded"]:
-                    print(f"       Decoded values:")
+                    out(f"       Decoded values:")
                     for k, v in analysis["decoded"].items():
                         # Format large numbers nicely
                         if isinstance(v, int) and v > 1000:
-                            print(
+                            out(
                                 f"         {k}: {v:,} ({v} hours = {v / 24:.0f} days)" if "32" in k else f"         {k}: {v:,}")
                         else:
-                            print(f"         {k}: {v}")
+                            out(f"         {k}: {v}")
+
+                sys.stdout.write("\n".join(lines) + "\n")
 
             # Run for 3 minutes max
             if time.time() - start_time > 180:
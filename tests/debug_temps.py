@@ -10,6 +10,7 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ebus_core.connection import SerialConnection, ConnectionConfig
+from timefmt import hms
 
 
 def main():
@@ -51,7 +52,7 @@ def main():
                 flow = flow_raw / 2.0 if flow_raw != 0xFF else None
                 ret = return_raw / 2.0 if return_raw != 0xFF else None
 
-                ts = time.strftime("%H:%M:%S")
+                ts = hms(time.time())
 
                 print(f"[{count:3d}] {ts} B511 type 1:")
                 print(f"      Raw bytes: {resp[:6].hex()}")
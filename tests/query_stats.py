@@ -10,8 +10,10 @@ Saunier Duval/Vaillant boilers typically have:
 
 import sys
 import os
+import struct
 import time
 import serial
+from collections import deque
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -19,10 +21,33 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ebus_core.crc import EbusCRC
 
 
+# QQ ZZ PB SB NN
+_HEADER = struct.Struct("<5B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+MAX_MESSAGES = 20000
+
+# Known query patterns for statistics on Vaillant/SD boilers
+STATS_PATTERNS = (
+    ("B511_00", "Extended status (pressure, etc.)"),
+    ("B511_01", "Temperatures"),
+    ("B511_02", "Modulation/setpoints"),
+    ("B512_00", "Possibly statistics type 0"),
+    ("B512_01", "Possibly statistics type 1"),
+    ("B512_02", "Possibly statistics type 2"),
+    ("B512_03", "Possibly statistics type 3"),
+    ("B512_04", "Possibly statistics type 4"),
+    ("B513_00", "Possibly error history 0"),
+    ("B513_01", "Possibly error history 1"),
+)
+
+
 class StatsQuerier:
     """Query boiler for statistics data."""
 
     SYNC = 0xAA
+    SYNC_BYTES = b"\xAA"
     BOILER_ADDR = 0x08
     MIPRO_ADDR = 0x10
 
@@ -38,7 +63,7 @@ class StatsQuerier:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=0.5
+                timeout=0.05
             )
             return True
         except Exception as e:
@@ -51,28 +76,33 @@ class StatsQuerier:
 
     def listen_for_response(self, timeout: float = 2.0) -> dict:
         """Listen for eBus messages and extract relevant ones."""
-        buffer = bytearray()
+        pending = bytearray()  # Start of a frame whose closing SYNC has not arrived yet.
         start = time.time()
         messages = []
 
-        while time.time() - start < timeout:
-            if self.serial.in_waiting:
-                data = self.serial.read(self.serial.in_waiting)
-                buffer.extend(data)
-
-                # Extract messages between SYNC bytes
-                while self.SYNC in buffer:
-                    sync_pos = buffer.index(self.SYNC)
-                    if sync_pos > 5:
-                        msg_data = bytes(buffer[:sync_pos])
-                        messages.append(msg_data)
-                    buffer = buffer[sync_pos:]
+        # Bind the per-iteration lookups once.
+        read_until = self.serial.read_until
+        sync_bytes = self.SYNC_BYTES
+        append = messages.append
+        now = time.time
+
+        while now() - start < timeout:
+            # One frame per call: everything up to and including the next SYNC.
+            chunk = read_until(sync_bytes, 260)
+            if not chunk.endswith(sync_bytes):
+                # Timed out (or hit the size cap) mid-frame; keep it for the next call.
+                pending += chunk
+                continue
 
-                    # Remove leading SYNCs
-                    while len(buffer) > 0 and buffer[0] == self.SYNC:
-                        buffer.pop(0)
+            if pending:
+                pending += chunk[:-1]
+                msg_data = bytes(pending)
+                pending.clear()
+            else:
+                msg_data = chunk[:-1]
 
-            time.sleep(0.01)
+            if len(msg_data) > 5:
+                append(msg_data)
 
         return messages
 
@@ -82,11 +112,7 @@ class StatsQuerier:
             if len(msg) < 6:
                 continue
 
-            src = msg[0]
-            dst = msg[1]
-            pb = msg[2]
-            sb = msg[3]
-            nn = msg[4]
+            src, dst, pb, sb, nn = _HEADER.unpack_from(msg)
 
             cmd = f"{pb:02X}{sb:02X}"
 
@@ -101,16 +127,14 @@ class StatsQuerier:
                 data = msg[5:5 + nn]
 
                 # Try 16-bit values
-                for i in range(0, len(data) - 1, 2):
-                    val = int.from_bytes(data[i:i + 2], 'little')
+                for i, (val,) in enumerate(_U16.iter_unpack(data[:len(data) & ~1])):
                     if 0 < val < 100000 and val != 0xFFFF:
-                        print(f"  uint16[{i}]: {val}")
+                        print(f"  uint16[{i * 2}]: {val}")
 
                 # Try 32-bit values
-                for i in range(0, len(data) - 3, 4):
-                    val = int.from_bytes(data[i:i + 4], 'little')
+                for i, (val,) in enumerate(_U32.iter_unpack(data[:len(data) & ~3])):
                     if 0 < val < 10000000 and val != 0xFFFFFFFF:
-                        print(f"  uint32[{i}]: {val:,}")
+                        print(f"  uint32[{i * 4}]: {val:,}")
 
 
 def main():
@@ -131,29 +155,16 @@ def main():
 
     print("✅ Connected!\n")
 
-    # Known query patterns for statistics on Vaillant/SD boilers
-    stats_patterns = {
-        "B511_00": "Extended status (pressure, etc.)",
-        "B511_01": "Temperatures",
-        "B511_02": "Modulation/setpoints",
-        "B512_00": "Possibly statistics type 0",
-        "B512_01": "Possibly statistics type 1",
-        "B512_02": "Possibly statistics type 2",
-        "B512_03": "Possibly statistics type 3",
-        "B512_04": "Possibly statistics type 4",
-        "B513_00": "Possibly error history 0",
-        "B513_01": "Possibly error history 1",
-    }
-
     print("Looking for the following patterns:")
-    for pattern, desc in stats_patterns.items():
+    for pattern, desc in STATS_PATTERNS:
         print(f"  {pattern}: {desc}")
     print()
 
     # Collect data for 60 seconds
     print("Collecting data for 60 seconds...")
 
-    all_messages = []
+    # Only recent boiler traffic matters; cap memory on long captures.
+    all_messages = deque(maxlen=MAX_MESSAGES)
     collected_patterns = {}
 
     try:
@@ -165,11 +176,7 @@ def main():
                 if len(msg) < 6:
                     continue
 
-                src = msg[0]
-                dst = msg[1]
-                pb = msg[2]
-                sb = msg[3]
-                nn = msg[4]
+                src, dst, pb, sb, nn = _HEADER.unpack_from(msg)
 
                 cmd = f"{pb:02X}{sb:02X}"
 
@@ -213,7 +220,7 @@ def main():
     print("Looking for statistics values in responses...")
     print("-" * 70)
 
-    # Analyze responses for potential counter values
+    # Analyze responses for potential counter values: (min, max, samples) per position
     potential_stats = {}
 
     for msg in all_messages:
@@ -227,31 +234,26 @@ def main():
             continue
 
         # Look for 16-bit values that could be counters (100-50000 range)
-        for i in range(0, len(data) - 1, 2):
-            val = int.from_bytes(data[i:i + 2], 'little')
+        for i, (val,) in enumerate(_U16.iter_unpack(data[:len(data) & ~1])):
             if 100 < val < 50000 and val != 0xFFFF:
-                key = f"uint16_pos{i}"
-                if key not in potential_stats:
-                    potential_stats[key] = set()
-                potential_stats[key].add(val)
+                key = f"uint16_pos{i * 2}"
+                lo, hi, seen = potential_stats.get(key, (val, val, 0))
+                potential_stats[key] = (min(lo, val), max(hi, val), seen + 1)
 
         # Look for 32-bit values that could be counters
-        for i in range(0, len(data) - 3, 4):
-            val = int.from_bytes(data[i:i + 4], 'little')
+        for i, (val,) in enumerate(_U32.iter_unpack(data[:len(data) & ~3])):
             if 100 < val < 10000000 and val != 0xFFFFFFFF:
-                key = f"uint32_pos{i}"
-                if key not in potential_stats:
-                    potential_stats[key] = set()
-                potential_stats[key].add(val)
+                key = f"uint32_pos{i * 4}"
+                lo, hi, seen = potential_stats.get(key, (val, val, 0))
+                potential_stats[key] = (min(lo, val), max(hi, val), seen + 1)
 
     if potential_stats:
         print("\nPotential counter values found:")
-        for key, values in sorted(potential_stats.items()):
-            vals_list = sorted(values)
-            if len(vals_list) <= 5:
-                print(f"  {key}: {vals_list}")
+        for key, (lo, hi, seen) in sorted(potential_stats.items()):
+            if lo == hi:
+                print(f"  {key}: {lo} ({seen} samples)")
             else:
-                print(f"  {key}: {vals_list[:3]} ... ({len(vals_list)} unique values)")
+                print(f"  {key}: {lo} .. {hi} ({seen} samples)")
     else:
         print("\nNo obvious counter values found in regular traffic.")
         print("Statistics may require active querying with service commands.")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Tests for AlertManager threshold and staleness checks."""
+
+import sys
+from dataclasses import FrozenInstanceError, replace
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from thelia.alerts import AlertManager, AlertSeverity, AlertThreshold, AlertType
+
+
+def _sensor(value, age=1.0):
+    return {"value": value, "age_seconds": age}
+
+
+def _active(manager):
+    return manager._active_alerts  # pylint: disable=protected-access
+
+
+def test_check_all_matches_separate_checks():
+    sensors = {
+        "boiler.water_pressure": _sensor(0.5, age=700.0),
+        "boiler.flow_temperature": _sensor(85.0),
+        "boiler.return_temperature": _sensor(60.0),
+        "boiler.delta_t": _sensor(10.0),
+    }
+    separate = AlertManager()
+    separate.check_sensors(sensors)
+    separate.check_sensor_staleness(sensors)
+
+    fused = AlertManager()
+    fired = []
+    fused.register_callback(fired.append)
+    fused.check_all(sensors)
+
+    assert set(_active(fused)) == set(_active(separate))
+    assert len(fired) == len(_active(fused))
+    stale = _active(fused)["boiler.water_pressure_stale"]
+    assert stale.alert_type == AlertType.COMMUNICATION
+    assert stale.value == "700s"
+
+
+def test_check_all_clears_resolved_alerts():
+    manager = AlertManager()
+    manager.check_all({"boiler.water_pressure": _sensor(0.5)})
+    assert "boiler.water_pressure_CRITICAL_PRESSURE" in _active(manager)
+    assert _active(manager)["boiler.water_pressure_CRITICAL_PRESSURE"].severity == AlertSeverity.CRITICAL
+
+    manager.check_all({"boiler.water_pressure": _sensor(1.5)})
+    assert _active(manager) == {}
+
+
+def test_recompiled_rules_support_conditions_and_ranges():
+    manager = AlertManager()
+    manager.rules = [
+        AlertThreshold(sensor="boiler.flow_temperature", min_value=20.0, max_value=70.0, message="Flow out of range"),
+        AlertThreshold(sensor="boiler.status_code", condition=lambda v: v != 0, message="Boiler fault"),
+    ]
+
+    manager.check_sensors({
+        "boiler.flow_temperature": _sensor(75.0),
+        "boiler.status_code": _sensor(3),
+    })
+
+    assert set(_active(manager)) == {
+        "boiler.flow_temperature_WARNING_SYSTEM",
+        "boiler.status_code_WARNING_SYSTEM",
+    }
+
+
+def test_failing_alert_callback_does_not_block_others():
+    manager = AlertManager()
+    fired = []
+
+    def broken(alert):
+        raise RuntimeError("boom")
+
+    manager.register_callback(broken)
+    manager.register_callback(fired.append)
+    manager.check_all({"boiler.water_pressure": _sensor(0.5)})
+
+    assert [alert.message for alert in fired] == ["Low water pressure"]
+
+
+def test_print_status_lists_most_severe_first(capsys):
+    manager = AlertManager()
+    manager.check_all({
+        "boiler.return_temperature": _sensor(60.0),
+        "boiler.water_pressure": _sensor(0.5),
+    })
+
+    manager.print_status()
+    out = capsys.readouterr().out
+    assert out.index("[CRITICAL]") < out.index("[INFO]")
+
+
+def test_add_rule_indexes_new_sensor():
+    manager = AlertManager()
+    manager.add_rule(AlertThreshold(sensor="dhw.temperature", max_value=65.0, message="DHW too hot"))
+
+    manager.check_sensors({"dhw.temperature": _sensor(70.0), "unrelated.sensor": _sensor(1.0)})
+
+    assert list(_active(manager)) == ["dhw.temperature_WARNING_SYSTEM"]
+
+
+def test_rules_edited_in_place_are_checked():
+    manager = AlertManager()
+    manager.rules.append(AlertThreshold(sensor="dhw.temperature", max_value=65.0, message="DHW too hot"))
+
+    manager.check_sensors({"dhw.temperature": _sensor(70.0)})
+
+    assert list(_active(manager)) == ["dhw.temperature_WARNING_SYSTEM"]
+
+
+def test_condition_rules_apply_to_binary_sensors():
+    manager = AlertManager()
+    manager.add_rule(AlertThreshold(sensor="boiler.flame", condition=lambda v: v is True, message="Flame on"))
+
+    manager.check_sensors({"boiler.flame": _sensor(True)})
+
+    assert "boiler.flame_WARNING_SYSTEM" in _active(manager)
+
+
+def test_rules_cannot_go_stale_after_in_place_edit():
+    manager = AlertManager()
+    with pytest.raises(FrozenInstanceError):
+        manager.rules[0].min_value = 2.5
+
+    manager.rules[0] = replace(manager.rules[0], min_value=2.5)
+    manager.check_sensors({"boiler.water_pressure": _sensor(2.0)})
+
+    assert "boiler.water_pressure_CRITICAL_PRESSURE" in _active(manager)
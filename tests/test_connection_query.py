@@ -161,3 +161,15 @@ def test_disconnect_clears_activity_timestamps():
 
     assert conn.seconds_since_last_activity() is None
     assert conn.seconds_since_last_telegram() is None
+
+
+def test_telegram_batch_generator_splits_and_flushes_batches():
+    conn = SerialConnection(ConnectionConfig())
+    raw_frame = bytes([0x10, 0xFE, 0xB5, 0x09, 0x00, 0x00, 0xAA])
+    conn._serial = _ReadableDummySerial([raw_frame * 3])  # pylint: disable=protected-access
+    conn._connected = True  # pylint: disable=protected-access
+
+    batches = conn.telegram_batch_generator(max_batch=2, max_wait_s=0.0)
+
+    assert len(next(batches)) == 2
+    assert len(next(batches)) == 1
@@ -10,6 +10,43 @@ from ebus_core.connection import SerialConnection, ConnectionConfig
 from ebus_core.telegram import EbusTelegram
 
 
+def _decode_b511(data: bytes, resp: bytes, out) -> None:
+    if len(data) < 1:
+        return
+    query_type = data[0]
+
+    if query_type == 2 and len(resp) >= 5:
+        out(f"\n🔍 B511 Type 2 Decoded:")
+        out(f"   byte[0] Modulation:     {resp[0]}%")
+        out(f"   byte[1] Outdoor cutoff: {resp[1]}°C (RAW, not /2)")
+        out(f"   byte[2] Max flow:       {resp[2] / 2.0:.1f}°C")
+        out(f"   byte[3] DHW setpoint:   {resp[3] / 2.0:.1f}°C  ← WATCH THIS")
+        if len(resp) >= 5:
+            out(f"   byte[4] Legionella:     {resp[4] / 2.0:.1f}°C")
+
+
+def _decode_b509(data: bytes, resp: bytes, out) -> None:
+    if len(data) < 2:
+        return
+
+    out(f"\n🔍 B509 Room Temp Decoded:")
+    out(f"   byte[0] Room temp:      {data[0] / 2.0:.1f}°C  ← WATCH THIS")
+    if data[1] != 0xFF:
+        adj = int.from_bytes([data[1]], 'little', signed=True)
+        out(f"   byte[1] Adjustment:     {adj}")
+
+
+# Known commands: (pc, sc) -> (name, decoder or None)
+_CMD_TABLE = {
+    (0xB5, 0x11): ("B511_STATUS_TEMPS", _decode_b511),
+    (0xB5, 0x04): ("B504_MODULATION", None),
+    (0xB5, 0x10): ("B510_TARGET_FLOW", None),
+    (0xB5, 0x09): ("B509_ROOM_TEMP", _decode_b509),
+    (0xB5, 0x16): ("B516_DATETIME", None),
+}
+_UNKNOWN_CMD = ("UNKNOWN", None)
+
+
 def analyze_telegram(telegram: EbusTelegram):
     """Print detailed telegram analysis."""
     src = telegram.source
@@ -19,51 +56,25 @@ def analyze_telegram(telegram: EbusTelegram):
     data = telegram.data or b''
     resp = telegram.response_data or b''
 
-    cmd_name = "UNKNOWN"
-
-    # Known commands
-    if (pc, sc) == (0xB5, 0x11):
-        cmd_name = "B511_STATUS_TEMPS"
-        if len(data) >= 1:
-            query_type = data[0]
-            cmd_name += f" (Type {query_type})"
-    elif (pc, sc) == (0xB5, 0x04):
-        cmd_name = "B504_MODULATION"
-    elif (pc, sc) == (0xB5, 0x10):
-        cmd_name = "B510_TARGET_FLOW"
-    elif (pc, sc) == (0xB5, 0x09):
-        cmd_name = "B509_ROOM_TEMP"
-    elif (pc, sc) == (0xB5, 0x16):
-        cmd_name = "B516_DATETIME"
-
-    print(f"\n{'=' * 70}")
-    print(f"Command: {cmd_name}")
-    print(f"Source: 0x{src:02X} → Dest: 0x{dst:02X}")
-    print(f"Primary: 0x{pc:02X}, Secondary: 0x{sc:02X}")
-    print(f"Data ({len(data)} bytes): {data.hex() if data else '(none)'}")
-    print(f"Response ({len(resp)} bytes): {resp.hex() if resp else '(none)'}")
+    cmd_name, decoder = _CMD_TABLE.get((pc, sc), _UNKNOWN_CMD)
+    if decoder is _decode_b511 and len(data) >= 1:
+        cmd_name += f" (Type {data[0]})"
+
+    lines = []
+    out = lines.append
+    out(f"\n{'=' * 70}")
+    out(f"Command: {cmd_name}")
+    out(f"Source: 0x{src:02X} → Dest: 0x{dst:02X}")
+    out(f"Primary: 0x{pc:02X}, Secondary: 0x{sc:02X}")
+    out(f"Data ({len(data)} bytes): {data.hex() if data else '(none)'}")
+    out(f"Response ({len(resp)} bytes): {resp.hex() if resp else '(none)'}")
 
     # Decode specific messages
-    if (pc, sc) == (0xB5, 0x11) and len(data) >= 1:
-        query_type = data[0]
-
-        if query_type == 2 and len(resp) >= 5:
-            print(f"\n🔍 B511 Type 2 Decoded:")
-            print(f"   byte[0] Modulation:     {resp[0]}%")
-            print(f"   byte[1] Outdoor cutoff: {resp[1]}°C (RAW, not /2)")
-            print(f"   byte[2] Max flow:       {resp[2] / 2.0:.1f}°C")
-            print(f"   byte[3] DHW setpoint:   {resp[3] / 2.0:.1f}°C  ← WATCH THIS")
-            if len(resp) >= 5:
-                print(f"   byte[4] Legionella:     {resp[4] / 2.0:.1f}°C")
-
-    elif (pc, sc) == (0xB5, 0x09) and len(data) >= 2:
-        print(f"\n🔍 B509 Room Temp Decoded:")
-        print(f"   byte[0] Room temp:      {data[0] / 2.0:.1f}°C  ← WATCH THIS")
-        if data[1] != 0xFF:
-            adj = int.from_bytes([data[1]], 'little', signed=True)
-            print(f"   byte[1] Adjustment:     {adj}")
-
-    print(f"{'=' * 70}")
+    if decoder is not None:
+        decoder(data, resp, out)
+
+    out(f"{'=' * 70}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -10,6 +10,15 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ebus_core.connection import SerialConnection, ConnectionConfig
 from thelia.parser import TheliaParser, DataAggregator
 from thelia.alerts import AlertManager, Alert
+from timefmt import hms
+
+
+# device_id broadcasts are counted and dropped before parsing.
+SKIP_CMDS = frozenset({(0x07, 0x04)})
+# Message names are interned by thelia.messages.
+IMPORTANT = frozenset(map(sys.intern, ("status_temps", "modulation_outdoor", "temp_setpoint", "room_temp")))
+# Deadlines are only checked after this many telegrams
+CLOCK_CHECK_EVERY = 16
 
 
 def on_alert(alert: Alert):
@@ -50,39 +59,50 @@ def main():
     try:
         count = 0
         displayed = 0
-        last_summary = time.time()
-        last_alert_check = time.time()
+        start = time.monotonic()
+        next_alert_check = start + 10.0
+        next_summary = start + 60.0
         device_id_count = 0
-
-        for telegram in connection.telegram_generator():
-            msg = parser.parse(telegram)
-            count += 1
-
-            # Skip device_id spam
-            if msg.name == "device_id":
-                device_id_count += 1
+        tick = 0
+
+        # Loop-invariant lookups bound once
+        parse = parser.parse
+        monotonic = time.monotonic
+        get_all_sensors = aggregator.get_all_sensors
+        check_all = alert_manager.check_all
+
+        for batch in connection.telegram_batch_generator(32):
+            for telegram in batch:
+                count += 1
+
+                # Skip device_id spam without paying for a parse
+                if (telegram.primary_command, telegram.secondary_command) in SKIP_CMDS:
+                    device_id_count += 1
+                    continue
+
+                # Only show important messages
+                name = parse(telegram).name
+                if name in IMPORTANT:
+                    displayed += 1
+                    if displayed <= 30:  # Limit output
+                        print(f"[{count:3d}] {hms(telegram.timestamp)} {name}")
+
+            tick += len(batch)
+            if tick < CLOCK_CHECK_EVERY:
                 continue
-
-            ts = msg.timestamp.strftime("%H:%M:%S")
-
-            # Only show important messages
-            if msg.name in ("status_temps", "modulation_outdoor", "temp_setpoint", "room_temp"):
-                displayed += 1
-                if displayed <= 30:  # Limit output
-                    print(f"[{count:3d}] {ts} {msg.name}")
+            tick = 0
+            now = monotonic()
 
             # Check alerts every 10 seconds
-            if time.time() - last_alert_check > 10:
-                sensors = aggregator.get_all_sensors()
-                alert_manager.check_sensors(sensors)
-                alert_manager.check_sensor_staleness(sensors)
-                last_alert_check = time.time()
+            if now >= next_alert_check:
+                check_all(get_all_sensors())
+                next_alert_check = now + 10.0
 
             # Print full status every 60 seconds
-            if time.time() - last_summary > 60:
+            if now >= next_summary:
                 aggregator.print_status()
                 alert_manager.print_status()
-                last_summary = time.time()
+                next_summary = now + 60.0
 
     except KeyboardInterrupt:
         print("\n\n⚠️ Interrupted")
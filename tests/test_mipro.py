@@ -3,16 +3,18 @@
 Capture and analyze MiPro controller messages.
 """
 
+import io
 import sys
 import os
+import struct
 import time
-from datetime import datetime
 from collections import defaultdict
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ebus_core.connection import SerialConnection, ConnectionConfig
 from ebus_core.telegram import EbusTelegram
+from timefmt import hms_ms
 
 # Known eBus addresses
 ADDRESSES = {
@@ -24,6 +26,14 @@ ADDRESSES = {
 }
 
 
+_unpack_s16 = struct.Struct("<h").unpack_from
+
+# Telegram lines are buffered and written to stdout in batches of this size,
+# or sooner once FLUSH_AFTER_SECONDS have passed since the last write
+FLUSH_EVERY = 32
+FLUSH_AFTER_SECONDS = 0.5
+
+
 def get_device_name(addr: int) -> str:
     return ADDRESSES.get(addr, f"Unknown-0x{addr:02X}")
 
@@ -35,54 +45,82 @@ def analyze_telegram(telegram: EbusTelegram) -> dict:
         "source_addr": telegram.source,
         "dest": get_device_name(telegram.destination),
         "dest_addr": telegram.destination,
-        "cmd": f"{telegram.primary_command:02X}{telegram.secondary_command:02X}",
-        "data": telegram.data.hex() if telegram.data else "",
+        "cmd": (telegram.primary_command << 8) | telegram.secondary_command,
+        "data": telegram.data or b"",
         "data_len": len(telegram.data) if telegram.data else 0,
-        "response": telegram.response_data.hex() if telegram.response_data else "",
+        "response": telegram.response_data or b"",
         "response_len": len(telegram.response_data) if telegram.response_data else 0,
     }
     return info
 
 
-def decode_known_values(cmd: str, data: bytes, response: bytes) -> dict:
-    """Try to decode known values from the data."""
-    values = {}
+# Packed-BCD byte -> decimal value, total over 0..255
+_BCD_LUT = bytes(((i >> 4) & 0x0F) * 10 + (i & 0x0F) for i in range(256))
+
 
-    if cmd == "B509" and len(data) >= 2:
+def _decode_b509(data: bytes, response: bytes) -> dict:
+    values = {}
+    if len(data) >= 2:
         # Room temperature from MiPro
         room_temp = data[0] / 2.0
         values["room_temp"] = f"{room_temp:.1f}°C"
         values["byte1"] = data[1]
+    return values
+
 
-    elif cmd == "B511" and len(data) >= 1:
+def _decode_b511(data: bytes, response: bytes) -> dict:
+    values = {}
+    if len(data) >= 1:
         query_type = data[0]
         values["query_type"] = query_type
 
         if response and len(response) >= 2:
-            temp = int.from_bytes(response[0:2], 'little', signed=True) / 256.0
+            temp = _unpack_s16(response, 0)[0] / 256.0
             values["temp1"] = f"{temp:.1f}°C"
+    return values
 
-    elif cmd == "B510" and len(data) >= 3:
+
+def _decode_b510(data: bytes, response: bytes) -> dict:
+    values = {}
+    if len(data) >= 3:
         setpoint = data[2] / 2.0
         values["flow_setpoint"] = f"{setpoint:.1f}°C"
+    return values
 
-    elif cmd == "B516" and len(data) >= 8:
-        # DateTime - try BCD
-        def bcd(b):
-            return ((b >> 4) * 10) + (b & 0x0F)
 
-        try:
-            values["time"] = f"{bcd(data[3]):02d}:{bcd(data[2]):02d}:{bcd(data[1]):02d}"
-            values["date"] = f"20{bcd(data[7]):02d}-{bcd(data[5]):02d}-{bcd(data[4]):02d}"
-        except:
-            pass
+def _decode_b516(data: bytes, response: bytes) -> dict:
+    values = {}
+    if len(data) >= 8:
+        # DateTime - BCD
+        bcd = _BCD_LUT
+        values["time"] = f"{bcd[data[3]]:02d}:{bcd[data[2]]:02d}:{bcd[data[1]]:02d}"
+        values["date"] = f"20{bcd[data[7]]:02d}-{bcd[data[5]]:02d}-{bcd[data[4]]:02d}"
+    return values
 
-    elif cmd == "B504" and response and len(response) >= 1:
-        values["modulation"] = f"{response[0]}%"
 
+def _decode_b504(data: bytes, response: bytes) -> dict:
+    values = {}
+    if response and len(response) >= 1:
+        values["modulation"] = f"{response[0]}%"
     return values
 
 
+# Keyed by (primary << 8) | secondary
+_DECODERS = {
+    0xB509: _decode_b509,
+    0xB511: _decode_b511,
+    0xB510: _decode_b510,
+    0xB516: _decode_b516,
+    0xB504: _decode_b504,
+}
+
+
+def decode_known_values(cmd: int, data: bytes, response: bytes) -> dict:
+    """Try to decode known values from the data."""
+    decoder = _DECODERS.get(cmd)
+    return decoder(data, response) if decoder else {}
+
+
 def main():
     PORT = "/dev/ttyAMA0"
 
@@ -102,13 +140,19 @@ def main():
     print("Capturing messages... (Ctrl+C to stop and show summary)\n")
     print("-" * 80)
 
-    # Statistics
-    messages_by_cmd = defaultdict(list)
+    # Statistics: running counters per command instead of every message
+    cmd_counts = defaultdict(int)
+    cmd_sample = {}
+    data_patterns_by_cmd = defaultdict(lambda: defaultdict(int))
+    resp_patterns_by_cmd = defaultdict(lambda: defaultdict(int))
     messages_by_source = defaultdict(int)
     messages_by_direction = defaultdict(int)
 
     count = 0
     start_time = time.time()
+    out = io.StringIO()
+    write = out.write
+    last_flush = start_time
 
     try:
         for telegram in connection.telegram_generator():
@@ -116,18 +160,23 @@ def main():
             info = analyze_telegram(telegram)
 
             # Track statistics
-            messages_by_cmd[info["cmd"]].append(info)
+            cmd = info["cmd"]
+            cmd_counts[cmd] += 1
+            cmd_sample.setdefault(cmd, info)
+            if info["data"]:
+                data_patterns_by_cmd[cmd][info["data"]] += 1
+            if info["response"]:
+                resp_patterns_by_cmd[cmd][info["response"]] += 1
             messages_by_source[info["source"]] += 1
             direction = f"{info['source']} → {info['dest']}"
             messages_by_direction[direction] += 1
 
             # Decode values
-            data = telegram.data if telegram.data else b''
-            resp = telegram.response_data if telegram.response_data else b''
-            decoded = decode_known_values(info["cmd"], data, resp)
+            decoded = decode_known_values(cmd, info["data"], info["response"])
 
             # Print message
-            ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+            now = time.time()
+            ts = hms_ms(now)
 
             # Color/emoji based on source
             if telegram.source == 0x10:
@@ -137,28 +186,35 @@ def main():
             else:
                 src_icon = "❓"
 
-            print(f"[{count:4d}] {ts} {src_icon} {info['source']:20s} → {info['dest']:15s} "
-                  f"CMD:{info['cmd']} ", end="")
+            write(f"[{count:4d}] {ts} {src_icon} {info['source']:20s} → {info['dest']:15s} "
+                  f"CMD:{info['cmd']:04X} ")
 
             if info['data']:
-                print(f"DATA:{info['data'][:20]}", end="")
+                write(f"DATA:{info['data'][:10].hex()}")
             if info['response']:
-                print(f" → RESP:{info['response'][:20]}", end="")
+                write(f" → RESP:{info['response'][:10].hex()}")
 
             # Print decoded values
             if decoded:
-                decoded_str = " | " + ", ".join(f"{k}={v}" for k, v in decoded.items())
-                print(decoded_str, end="")
+                write(" | " + ", ".join(f"{k}={v}" for k, v in decoded.items()))
+
+            write("\n")
 
-            print()
+            if count % FLUSH_EVERY == 0 or now - last_flush >= FLUSH_AFTER_SECONDS:
+                sys.stdout.write(out.getvalue())
+                sys.stdout.flush()
+                out.seek(0)
+                out.truncate(0)
+                last_flush = now
 
             # Run for 2 minutes or 200 messages
             if count >= 200 or (time.time() - start_time) > 120:
                 break
 
     except KeyboardInterrupt:
-        print("\n\n⚠️ Interrupted by user")
+        write("\n\n⚠️ Interrupted by user\n")
     finally:
+        sys.stdout.write(out.getvalue())
         connection.disconnect()
 
     # Print summary
@@ -182,39 +238,32 @@ def main():
         print(f"   {direction:45s}: {cnt:4d} ({pct:5.1f}%)")
 
     print("\n📝 Commands Seen:")
-    for cmd, msgs in sorted(messages_by_cmd.items()):
-        cnt = len(msgs)
+    for cmd, cnt in sorted(cmd_counts.items()):
         # Show sample data
-        sample = msgs[0]
-        print(f"   {cmd}: {cnt:4d} messages")
-        print(f"        Sample: DATA={sample['data'][:30] if sample['data'] else 'none':30s} "
-              f"RESP={sample['response'][:30] if sample['response'] else 'none'}")
+        sample = cmd_sample[cmd]
+        print(f"   {cmd:04X}: {cnt:4d} messages")
+        print(f"        Sample: DATA={sample['data'][:15].hex() if sample['data'] else 'none':30s} "
+              f"RESP={sample['response'][:15].hex() if sample['response'] else 'none'}")
 
     print("\n" + "=" * 80)
     print("🔍 DETAILED COMMAND ANALYSIS")
     print("=" * 80)
 
-    for cmd, msgs in sorted(messages_by_cmd.items()):
-        print(f"\n--- Command {cmd} ({len(msgs)} messages) ---")
+    for cmd, cnt in sorted(cmd_counts.items()):
+        print(f"\n--- Command {cmd:04X} ({cnt} messages) ---")
 
         # Show unique data patterns
-        data_patterns = defaultdict(int)
-        resp_patterns = defaultdict(int)
-
-        for m in msgs:
-            if m['data']:
-                data_patterns[m['data']] += 1
-            if m['response']:
-                resp_patterns[m['response']] += 1
+        data_patterns = data_patterns_by_cmd[cmd]
+        resp_patterns = resp_patterns_by_cmd[cmd]
 
         print("  Data patterns:")
         for pattern, cnt in sorted(data_patterns.items(), key=lambda x: -x[1])[:5]:
-            print(f"    {pattern}: {cnt}x")
+            print(f"    {pattern.hex()}: {cnt}x")
 
         if resp_patterns:
             print("  Response patterns:")
             for pattern, cnt in sorted(resp_patterns.items(), key=lambda x: -x[1])[:5]:
-                print(f"    {pattern}: {cnt}x")
+                print(f"    {pattern.hex()}: {cnt}x")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 """Tests for MQTT client resilience."""
 
+import socket
+import time
 from unittest.mock import patch
 
 import paho.mqtt.client as mqtt
 from paho.mqtt.packettypes import PacketTypes
 from paho.mqtt.reasoncodes import ReasonCode
 
-from thelia.mqtt import HAMqttClient
+from thelia.mqtt import DISCOVERY_EPOCH_GRACE_SECONDS, HAMqttClient
 
 
 class _FakePublishInfo:
@@ -28,13 +30,13 @@ class _FakeClient:
         self.publish_results = list(publish_results or [])
         self.publish_calls = []
         self.connected = True
-        self.loop_started = False
-        self.loop_stopped = False
         self.disconnect_calls = 0
         self.connect_async_calls = 0
         self.reconnect_calls = 0
+        self.subscribe_calls = []
         self.on_connect = None
         self.on_disconnect = None
+        self.on_message = None
 
     def username_pw_set(self, username, password):
         self.username = username
@@ -49,11 +51,11 @@ class _FakeClient:
     def enable_logger(self, logger):
         self.logger = logger
 
-    def loop_start(self):
-        self.loop_started = True
+    def socket(self):
+        return None
 
-    def loop_stop(self):
-        self.loop_stopped = True
+    def want_write(self):
+        return False
 
     def connect_async(self, broker, port, keepalive):
         self.connect_async_calls += 1
@@ -69,6 +71,10 @@ class _FakeClient:
         self.disconnect_calls += 1
         self.connected = False
 
+    def subscribe(self, topic, qos=0):
+        self.subscribe_calls.append((topic, qos))
+        return (mqtt.MQTT_ERR_SUCCESS, 1)
+
     def publish(self, topic, payload=None, qos=0, retain=False):
         self.publish_calls.append((topic, payload, qos, retain))
         if self.publish_results:
@@ -85,14 +91,11 @@ def test_publish_sensors_restarts_client_after_publish_error():
         mqtt_client.connected = True
         mqtt_client.discovery_sent = True
         mqtt_client._ever_connected = True  # pylint: disable=protected-access
-        mqtt_client._loop_started = True  # pylint: disable=protected-access
 
         ok = mqtt_client.publish_sensors({"boiler.flow_temperature": {"value": 41.5, "unit": "C"}})
 
     assert ok is False
     assert broken_client.disconnect_calls == 1
-    assert broken_client.loop_stopped is True
-    assert replacement_client.loop_started is True
     assert replacement_client.connect_async_calls == 1
 
 
@@ -105,14 +108,11 @@ def test_publish_healthcheck_restarts_client_when_ack_never_arrives():
         mqtt_client.connected = True
         mqtt_client.discovery_sent = True
         mqtt_client._ever_connected = True  # pylint: disable=protected-access
-        mqtt_client._loop_started = True  # pylint: disable=protected-access
 
         ok = mqtt_client.publish_healthcheck()
 
     assert ok is False
     assert broken_client.disconnect_calls == 1
-    assert broken_client.loop_stopped is True
-    assert replacement_client.loop_started is True
     assert replacement_client.connect_async_calls == 1
 
 
@@ -135,7 +135,6 @@ def test_on_connect_accepts_reasoncode_object():
 
     with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
         mqtt_client = HAMqttClient("broker", 1883)
-        mqtt_client._loop_started = True  # pylint: disable=protected-access
         healthy_client.connected = True
 
         reason_code = ReasonCode(PacketTypes.CONNACK, "Success")
@@ -155,3 +154,151 @@ def test_on_disconnect_accepts_reasoncode_object():
         mqtt_client._on_disconnect(healthy_client, None, None, reason_code, None)
 
     assert mqtt_client.connected is False
+
+
+class _FakeMessage:
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+
+
+def test_on_connect_subscribes_to_discovery_epoch():
+    healthy_client = _FakeClient()
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+
+        reason_code = ReasonCode(PacketTypes.CONNACK, "Success")
+        mqtt_client._on_connect(healthy_client, None, None, reason_code, None)
+
+    assert ("ebus/thelia/_discovery_epoch", 1) in healthy_client.subscribe_calls
+
+
+def test_matching_discovery_epoch_skips_republish():
+    healthy_client = _FakeClient()
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+        mqtt_client.connected = True
+        epoch = mqtt_client._discovery_epoch.encode()  # pylint: disable=protected-access
+
+        mqtt_client._on_message(  # pylint: disable=protected-access
+            healthy_client, None, _FakeMessage("ebus/thelia/_discovery_epoch", epoch)
+        )
+        ok = mqtt_client.publish_sensors({"boiler.flow_temperature": {"value": 41.5, "unit": "C"}})
+
+    assert ok is True
+    assert mqtt_client.discovery_sent is True
+    assert [call[0] for call in healthy_client.publish_calls] == ["ebus/thelia/boiler.flow_temperature"]
+
+
+def test_stale_discovery_epoch_republishes_configs_and_epoch():
+    healthy_client = _FakeClient()
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+        mqtt_client.connected = True
+
+        mqtt_client._on_message(  # pylint: disable=protected-access
+            healthy_client, None, _FakeMessage("ebus/thelia/_discovery_epoch", b"0")
+        )
+        ok = mqtt_client.publish_sensors({"boiler.flow_temperature": {"value": 41.5, "unit": "C"}})
+
+    topics = [call[0] for call in healthy_client.publish_calls]
+    assert ok is True
+    assert "homeassistant/sensor/ebus_thelia/boiler_flow_temperature/config" in topics
+    assert "ebus/thelia/_discovery_epoch" in topics
+
+
+def test_discovery_waits_for_epoch_after_connect():
+    healthy_client = _FakeClient()
+    sensors = {"boiler.flow_temperature": {"value": 41.5, "unit": "C"}}
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+        reason_code = ReasonCode(PacketTypes.CONNACK, "Success")
+        mqtt_client._on_connect(healthy_client, None, None, reason_code, None)
+        healthy_client.publish_calls.clear()
+
+        # The main loop publishes before the retained epoch has been delivered.
+        assert mqtt_client.publish_sensors(sensors) is False
+        assert healthy_client.publish_calls == []
+
+        epoch = mqtt_client._discovery_epoch.encode()  # pylint: disable=protected-access
+        mqtt_client._on_message(  # pylint: disable=protected-access
+            healthy_client, None, _FakeMessage("ebus/thelia/_discovery_epoch", epoch)
+        )
+        assert mqtt_client.publish_sensors(sensors) is True
+
+    topics = [call[0] for call in healthy_client.publish_calls]
+    assert topics == ["ebus/thelia/boiler.flow_temperature"]
+
+
+def test_discovery_published_when_epoch_never_arrives():
+    healthy_client = _FakeClient()
+    sensors = {"boiler.flow_temperature": {"value": 41.5, "unit": "C"}}
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+        with patch("thelia.mqtt.time.monotonic", return_value=1000.0):
+            reason_code = ReasonCode(PacketTypes.CONNACK, "Success")
+            mqtt_client._on_connect(healthy_client, None, None, reason_code, None)
+        with patch("thelia.mqtt.time.monotonic", return_value=1000.0 + DISCOVERY_EPOCH_GRACE_SECONDS):
+            ok = mqtt_client.publish_sensors(sensors)
+
+    topics = [call[0] for call in healthy_client.publish_calls]
+    assert ok is True
+    assert "homeassistant/sensor/ebus_thelia/boiler_flow_temperature/config" in topics
+    assert "ebus/thelia/_discovery_epoch" in topics
+
+
+def test_poll_sleeps_without_socket():
+    healthy_client = _FakeClient()
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+        with patch("thelia.mqtt.time.sleep") as sleep:
+            mqtt_client.poll(0.25)
+
+    sleep.assert_called_once_with(0.25)
+    assert healthy_client.reconnect_calls == 1
+
+
+def test_poll_services_socket_for_full_period():
+    local, remote = socket.socketpair()
+    healthy_client = _FakeClient()
+    healthy_client.socket = lambda: local
+    reads = []
+    healthy_client.loop_read = lambda: reads.append(local.recv(64))
+    healthy_client.loop_write = lambda: None
+    healthy_client.loop_misc = lambda: None
+
+    try:
+        with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+            mqtt_client = HAMqttClient("broker", 1883)
+            remote.sendall(b"\x90\x03")
+            started = time.monotonic()
+            mqtt_client.poll(0.05)
+            elapsed = time.monotonic() - started
+    finally:
+        local.close()
+        remote.close()
+
+    assert reads == [b"\x90\x03"]
+    assert elapsed >= 0.05
+
+
+def test_reconnect_attempts_back_off():
+    healthy_client = _FakeClient()
+    healthy_client.connected = False
+
+    with patch("thelia.mqtt.mqtt.Client", return_value=healthy_client):
+        mqtt_client = HAMqttClient("broker", 1883)
+        attempts = []
+        for now in (100.0, 104.0, 105.0, 110.0, 115.0, 125.0):
+            with patch("thelia.mqtt.time.monotonic", return_value=now):
+                mqtt_client.ensure_connection("test")
+            attempts.append(healthy_client.reconnect_calls)
+
+    # Retries after 5s, then 10s, then 20s.
+    assert attempts == [1, 1, 2, 2, 3, 3]
@@ -40,6 +40,24 @@ def test_telegram_parser_extracts_sync_delimited_frame():
     assert telegram.crc == 0x00
 
 
+def test_telegram_parser_feeds_concatenated_frames():
+    frames = [
+        bytes([0x10, 0xFE, 0xB5, 0x09, 0x01, 0x2B, 0x00]),
+        bytes([0x10, 0x08, 0xB5, 0x04, 0x01, 0x00, 0x00, 0x00, 0x02, 0x2A, 0x00, 0x00, 0x00]),
+        bytes([0x10, 0x08, 0xB5, 0x10, 0x03, 0x00, 0x00, 0x5A, 0x00, 0x00]),
+    ]
+    raw = b"\xAA" + b"\xAA".join(frames) + b"\xAA"
+
+    telegrams = TelegramParser().feed(raw)
+    messages = [TheliaParser().parse(telegram) for telegram in telegrams]
+
+    assert [t.command for t in telegrams] == [(0xB5, 0x09), (0xB5, 0x04), (0xB5, 0x10)]
+    assert telegrams[1].response_data == bytes([0x2A, 0x00])
+    assert [m.name for m in messages] == ["room_temp", "modulation_outdoor", "temp_setpoint"]
+    assert messages[1].response_data["modulation"] == 42
+    assert messages[2].query_data["target_flow_temp"] == 45.0
+
+
 def test_thelia_parser_decodes_room_temperature():
     parser = TheliaParser()
     telegram = EbusTelegram(
@@ -63,3 +81,54 @@ def test_message_definitions_are_registered():
     assert len(THELIA_MESSAGES) >= 5
     assert get_message_definition(0xB5, 0x11) is not None
     assert get_message_definition(0xB5, 0x11).name == "status_temps"
+
+
+def test_message_lookup_matches_registry():
+    for (primary, secondary), msg_def in THELIA_MESSAGES.items():
+        assert get_message_definition(primary, secondary) is msg_def
+    assert get_message_definition(0xB5, 0x7F) is None
+    assert get_message_definition(0x1B5, 0x11) is None
+    assert get_message_definition(-1, 0x11) is None
+
+
+def test_parser_treats_out_of_range_commands_as_unknown():
+    parser = TheliaParser()
+
+    for primary, secondary in ((0x100, 0x11), (-1, 0x11), (0xB5, 0x111)):
+        message = parser.parse(EbusTelegram(
+            source=0x10, destination=0x08, primary_command=primary, secondary_command=secondary,
+        ))
+        assert message.name == "unknown"
+
+
+def test_lookup_finds_entries_added_directly_to_registry():
+    msg_def = THELIA_MESSAGES[(0xB5, 0x11)]
+    THELIA_MESSAGES[(0xB5, 0x7E)] = msg_def
+    try:
+        assert get_message_definition(0xB5, 0x7E) is msg_def
+    finally:
+        del THELIA_MESSAGES[(0xB5, 0x7E)]
+
+
+def test_message_names_are_interned():
+    parser = TheliaParser()
+    unknown = parser.parse(EbusTelegram(source=0x10, destination=0x08, primary_command=0xB5, secondary_command=0x7F))
+
+    assert get_message_definition(0x07, 0x04).name is sys.intern("device_id")
+    assert unknown.name is sys.intern("unknown")
+
+
+def test_parser_callbacks_fire_in_order_and_isolate_errors():
+    parser = TheliaParser()
+    seen = []
+
+    def broken(message):
+        raise RuntimeError("boom")
+
+    parser.register_callback(lambda m: seen.append(("first", m.name)))
+    parser.register_callback(broken)
+    parser.register_callback(lambda m: seen.append(("last", m.name)))
+
+    parser.parse(EbusTelegram(source=0x10, destination=0x08, primary_command=0xB5, secondary_command=0x7F))
+
+    assert seen == [("first", "unknown"), ("last", "unknown")]
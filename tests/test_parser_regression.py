@@ -194,3 +194,15 @@ def test_mipro_room_temperature_is_published(tmp_path):
     aggregator.update(_msg_b509_from_mipro(now, 43))
     assert aggregator.get_sensor("boiler.room_temperature") == 21.5
     assert aggregator.get_sensor("mipro.room_temperature") == 21.5
+
+
+def test_sensors_are_tagged_numeric_at_ingestion(tmp_path):
+    aggregator = DataAggregator(state_file=str(tmp_path / "runtime_state.json"), flame_debounce_seconds=0)
+    now = datetime.now()
+
+    aggregator.update(_msg_b504(now, bytes([42])))
+    sensors = aggregator.get_all_sensors()
+
+    assert sensors["boiler.burner_modulation"]["numeric"] is True
+    assert all(entry["numeric"] is isinstance(entry["value"], (int, float)) for entry in sensors.values())
+    assert any(isinstance(entry["value"], bool) for entry in sensors.values())
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Timestamp formatting shared by the capture and debug scripts."""
+
+import time
+
+_hms_second = -1
+_hms_text = ""
+
+
+def hms(now: float) -> str:
+    """Format ``now`` as HH:MM:SS, calling strftime at most once per second."""
+    global _hms_second, _hms_text
+    second = int(now)
+    if second != _hms_second:
+        _hms_second = second
+        _hms_text = time.strftime("%H:%M:%S", time.localtime(second))
+    return _hms_text
+
+
+def hms_ms(now: float) -> str:
+    """Format ``now`` as HH:MM:SS.mmm."""
+    return f"{hms(now)}.{int((now % 1) * 1000):03d}"
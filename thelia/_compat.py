@@ -0,0 +1,8 @@
+"""
+Helpers for the range of Python versions the integration supports.
+"""
+
+import sys
+
+# dataclass(slots=True) needs Python 3.10; older interpreters keep __dict__
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -4,10 +4,16 @@ Checks sensor values against defined thresholds.
 """
 
 import logging
+import sys
 import time
 from typing import Dict, List, Callable, Optional, Any
-from dataclasses import dataclass, field
-from enum import Enum, auto
+from dataclasses import dataclass
+from enum import Enum
+
+from ._compat import DATACLASS_SLOTS
+
+# Shared by all managers; keeps the logger name the per-instance lookup used
+_LOGGER = logging.getLogger("AlertManager")
 
 
 # ==========================================
@@ -20,6 +26,15 @@ class AlertSeverity(Enum):
     CRITICAL = "CRITICAL"
 
 
+# Display order for print_status (most severe first) and per-severity icons
+_SEVERITY_RANK = {AlertSeverity.CRITICAL: 0, AlertSeverity.WARNING: 1, AlertSeverity.INFO: 2}
+_SEVERITY_ICON = {
+    AlertSeverity.INFO: "ℹ️",
+    AlertSeverity.WARNING: "⚠️",
+    AlertSeverity.CRITICAL: "🚨",
+}
+
+
 class AlertType(Enum):
     PRESSURE = "pressure"
     TEMPERATURE = "temperature"
@@ -27,9 +42,13 @@ class AlertType(Enum):
     COMMUNICATION = "communication"
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class AlertThreshold:
-    """Defines a rule for triggering an alert."""
+    """
+    Defines a rule for triggering an alert.
+    Frozen so AlertManager's compiled index cannot go stale; swap in a
+    dataclasses.replace() copy to change a rule.
+    """
     sensor: str
     min_value: Optional[float] = None
     max_value: Optional[float] = None
@@ -39,7 +58,7 @@ class AlertThreshold:
     condition: Optional[Callable[[Any], bool]] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Alert:
     """The actual alert instance generated when a rule is broken."""
     severity: AlertSeverity
@@ -50,11 +69,7 @@ class Alert:
     timestamp: float
 
     def __str__(self):
-        icon = "ℹ️"
-        if self.severity == AlertSeverity.WARNING:
-            icon = "⚠️"
-        elif self.severity == AlertSeverity.CRITICAL:
-            icon = "🚨"
+        icon = _SEVERITY_ICON.get(self.severity, "ℹ️")
         return f"{icon} [{self.severity.value}] {self.message} (Value: {self.value})"
 
 
@@ -62,15 +77,41 @@ class Alert:
 # 2. The Alert Manager
 # ==========================================
 
+# Sensors that raise a communication alert when they stop updating
+STALE_SENSORS = ("boiler.water_pressure", "boiler.flow_temperature")
+_STALE_KEYS = {name: sys.intern(f"{name}_stale") for name in STALE_SENSORS}
+
+# Compiled rule operations: a single bound, or a predicate built by _rule_predicate
+_OP_BELOW = 0
+_OP_ABOVE = 1
+_OP_RULE = 2
+
+
+def _rule_predicate(rule: AlertThreshold) -> Callable[[Any], bool]:
+    """Bind a range/condition rule's limits into a closure evaluated per reading."""
+    min_value, max_value, condition = rule.min_value, rule.max_value, rule.condition
+
+    def is_triggered(value: Any) -> bool:
+        return (
+            (min_value is not None and value < min_value)
+            or (max_value is not None and value > max_value)
+            or bool(condition and condition(value))
+        )
+
+    return is_triggered
+
+
 class AlertManager:
     def __init__(self):
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.logger = _LOGGER
+        self._log_error = _LOGGER.error
         self._callbacks: List[Callable[[Alert], None]] = []
         self._active_alerts: Dict[str, Alert] = {}
         self.rules: List[AlertThreshold] = []
 
         # Load default rules matching your live_test requirements
         self._load_default_rules()
+        self._compile_rules()
 
     def _load_default_rules(self):
         """Define the logic for Pressure, Delta T, etc."""
@@ -117,54 +158,84 @@ class AlertManager:
             )
         ]
 
+    def add_rule(self, rule: AlertThreshold) -> None:
+        """Register an extra rule and refresh the per-sensor index."""
+        self.rules.append(rule)
+        self._compile_rules()
+
     def register_callback(self, callback: Callable[[Alert], None]) -> None:
         self._callbacks.append(callback)
 
-    def _notify(self, alert: Alert) -> None:
-        for cb in self._callbacks:
-            try:
-                cb(alert)
-            except Exception as e:
-                self.logger.error(f"Alert callback error: {e}")
-
-    def check_sensors(self, sensors: Dict[str, Dict]) -> None:
-        """
-        Iterate through defined rules and check against current sensor values.
-        """
-        current_time = time.time()
+    def _notify(self, alerts: List[Alert]) -> None:
+        """Deliver the alerts raised by one check to every callback."""
+        callbacks = self._callbacks
+        if not callbacks:
+            return
+        log_error = self._log_error
+        for cb in callbacks:
+            for alert in alerts:
+                try:
+                    cb(alert)
+                except Exception as e:
+                    log_error("Alert callback error: %s", e)
 
+    def _compile_rules(self) -> None:
+        """Index self.rules by sensor as (op, threshold, rule, alert_key) tuples."""
+        by_sensor: Dict[str, List[tuple]] = {}
         for rule in self.rules:
-            # Skip if sensor data not available
-            if rule.sensor not in sensors:
-                continue
+            if rule.condition is None and rule.max_value is None and rule.min_value is not None:
+                op, threshold = _OP_BELOW, rule.min_value
+            elif rule.condition is None and rule.min_value is None and rule.max_value is not None:
+                op, threshold = _OP_ABOVE, rule.max_value
+            else:
+                op, threshold = _OP_RULE, _rule_predicate(rule)
+            # Create a unique key for this specific alert rule
+            # e.g. "boiler.water_pressure_CRITICAL_PRESSURE"
+            alert_key = sys.intern(f"{rule.sensor}_{rule.severity.name}_{rule.alert_type.name}")
+            rules = by_sensor.setdefault(sys.intern(rule.sensor), [])
+            rules.append((op, threshold, rule, alert_key))
+        # Staleness-only sensors get an empty rule list so check_all visits them
+        for name in STALE_SENSORS:
+            by_sensor.setdefault(name, [])
+        self._rules_by_sensor = {name: tuple(rules) for name, rules in by_sensor.items()}
+        self._compiled_from = list(self.rules)
 
-            sensor_data = sensors[rule.sensor]
-            value = sensor_data["value"]
+    def _rule_index(self) -> Dict[str, tuple]:
+        """Return the per-sensor index, rebuilt if self.rules was replaced or its list changed."""
+        if self._compiled_from != self.rules:
+            self._compile_rules()
+        return self._rules_by_sensor
 
-            # Skip if data is too old (e.g., > 5 minutes)
-            if sensor_data.get("age_seconds", 0) > 300:
-                continue
+    def _check_rules(self, rules: tuple, sensor_data: Dict, current_time: float,
+                     new_alerts: List[Alert]) -> None:
+        # Skip if data is too old (e.g., > 5 minutes)
+        if not rules or sensor_data.get("age_seconds", 0) > 300:
+            return
 
-            # Check logic
-            is_triggered = False
-            try:
-                if isinstance(value, (int, float)):
-                    if rule.min_value is not None and value < rule.min_value:
-                        is_triggered = True
-                    if rule.max_value is not None and value > rule.max_value:
-                        is_triggered = True
-                    if rule.condition and rule.condition(value):
-                        is_triggered = True
-            except Exception:
-                continue
+        value = sensor_data["value"]
+        # DataAggregator tags readings at ingestion; plain dicts are checked here
+        numeric = sensor_data.get("numeric")
+        if numeric is None:
+            numeric = isinstance(value, (int, float))
+        active = self._active_alerts
 
-            # Create a unique key for this specific alert rule
-            # e.g. "boiler.water_pressure_CRITICAL"
-            alert_key = f"{rule.sensor}_{rule.severity.name}_{rule.alert_type.name}"
+        for op, threshold, rule, alert_key in rules:
+            # Check logic
+            if not numeric:
+                is_triggered = False
+            elif op == _OP_BELOW:
+                is_triggered = value < threshold
+            elif op == _OP_ABOVE:
+                is_triggered = value > threshold
+            else:
+                try:
+                    is_triggered = threshold(value)
+                except Exception:
+                    continue
 
             if is_triggered:
                 # Only notify if this is a NEW alert
-                if alert_key not in self._active_alerts:
+                if alert_key not in active:
                     alert = Alert(
                         severity=rule.severity,
                         alert_type=rule.alert_type,
@@ -173,39 +244,83 @@ class AlertManager:
                         value=value,
                         timestamp=current_time
                     )
-                    self._active_alerts[alert_key] = alert
-                    self._notify(alert)
+                    active[alert_key] = alert
+                    new_alerts.append(alert)
             else:
                 # Clear alert if condition is resolved
-                if alert_key in self._active_alerts:
-                    del self._active_alerts[alert_key]
+                active.pop(alert_key, None)
+
+    def _check_stale(self, name: str, sensor_data: Dict, current_time: float,
+                     new_alerts: List[Alert]) -> None:
+        age = sensor_data["age_seconds"]
+        key = _STALE_KEYS[name]
+
+        if age > 600:  # 10 minutes
+            if key not in self._active_alerts:
+                alert = Alert(
+                    severity=AlertSeverity.WARNING,
+                    alert_type=AlertType.COMMUNICATION,
+                    message=f"Sensor data stale (>10m)",
+                    sensor=name,
+                    value=f"{age:.0f}s",
+                    timestamp=current_time
+                )
+                self._active_alerts[key] = alert
+                new_alerts.append(alert)
+        else:
+            self._active_alerts.pop(key, None)
+
+    def _present_sensors(self, sensors: Dict[str, Dict]) -> List[tuple]:
+        """
+        Pair watched sensors with their data as (name, rules, sensor_data),
+        walking whichever of the two dicts is smaller.
+        """
+        index = self._rule_index()
+        if len(sensors) < len(index):
+            return [(name, index[name], data) for name, data in sensors.items() if name in index]
+        return [(name, rules, sensors[name]) for name, rules in index.items() if name in sensors]
+
+    def check_sensors(self, sensors: Dict[str, Dict]) -> None:
+        """
+        Check the compiled rules against current sensor values.
+        """
+        current_time = time.time()
+        new_alerts: List[Alert] = []
+
+        for _, rules, sensor_data in self._present_sensors(sensors):
+            self._check_rules(rules, sensor_data, current_time, new_alerts)
+
+        if new_alerts:
+            self._notify(new_alerts)
 
     def check_sensor_staleness(self, sensors: Dict[str, Dict]) -> None:
         """
         Check if critical sensors have stopped updating.
         """
-        critical_sensors = ["boiler.water_pressure", "boiler.flow_temperature"]
+        current_time = time.time()
+        new_alerts: List[Alert] = []
 
-        for name in critical_sensors:
+        for name in STALE_SENSORS:
             if name in sensors:
-                age = sensors[name]["age_seconds"]
-                key = f"{name}_stale"
-
-                if age > 600:  # 10 minutes
-                    if key not in self._active_alerts:
-                        alert = Alert(
-                            severity=AlertSeverity.WARNING,
-                            alert_type=AlertType.COMMUNICATION,
-                            message=f"Sensor data stale (>10m)",
-                            sensor=name,
-                            value=f"{age:.0f}s",
-                            timestamp=time.time()
-                        )
-                        self._active_alerts[key] = alert
-                        self._notify(alert)
-                else:
-                    if key in self._active_alerts:
-                        del self._active_alerts[key]
+                self._check_stale(name, sensors[name], current_time, new_alerts)
+
+        if new_alerts:
+            self._notify(new_alerts)
+
+    def check_all(self, sensors: Dict[str, Dict]) -> None:
+        """
+        Run threshold and staleness checks in one pass, looking each sensor up once.
+        """
+        current_time = time.time()
+        new_alerts: List[Alert] = []
+
+        for name, rules, sensor_data in self._present_sensors(sensors):
+            self._check_rules(rules, sensor_data, current_time, new_alerts)
+            if name in _STALE_KEYS:
+                self._check_stale(name, sensor_data, current_time, new_alerts)
+
+        if new_alerts:
+            self._notify(new_alerts)
 
     def print_status(self) -> None:
         if not self._active_alerts:
@@ -215,6 +330,9 @@ class AlertManager:
         print("\n" + "!" * 50)
         print(f"🚨 ACTIVE ALERTS ({len(self._active_alerts)})")
         print("!" * 50)
-        for alert in self._active_alerts.values():
+        active = list(self._active_alerts.values())
+        if len(active) > 1:
+            active.sort(key=lambda a: _SEVERITY_RANK[a.severity])
+        for alert in active:
             print(f"   {alert}")
         print("\n")
\ No newline at end of file
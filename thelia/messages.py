@@ -2,10 +2,14 @@
 Thelia Condens boiler message definitions.
 """
 
+import struct
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Optional, List
 from enum import Enum
 
+from ._compat import DATACLASS_SLOTS
+
 
 # Invalid/Not Available markers
 INVALID_UINT8 = 0xFF
@@ -27,7 +31,141 @@ class DataType(Enum):
     BYTES = "bytes"
 
 
-@dataclass
+# Decoders are generated per field with offsets, sentinels and scaling baked
+# in as literals, and shared between fields with the same decode shape.
+_DECODER_CACHE: Dict[tuple, Callable[[bytes], Any]] = {}
+
+_U16 = struct.Struct("<H").unpack_from
+_S16 = struct.Struct("<h").unpack_from
+
+# Packed BCD byte -> 0..99, or 0xFF when either nibble is above 9
+_BCD_LUT = bytes(
+    (b >> 4) * 10 + (b & 0x0F) if (b >> 4) <= 9 and (b & 0x0F) <= 9 else 0xFF
+    for b in range(256)
+)
+
+# Byte / 2 and byte / 10; both are already exact to one decimal
+_DATA1C_LUT = tuple(b * 0.5 for b in range(256))
+_PRESSURE_LUT = tuple(b / 10.0 for b in range(256))
+
+# Names the generated decoder source may reference
+_DECODER_GLOBALS: Dict[str, Any] = {
+    "_U16": _U16,
+    "_S16": _S16,
+    "_BCD_LUT": _BCD_LUT,
+    "_DATA1C_LUT": _DATA1C_LUT,
+    "_PRESSURE_LUT": _PRESSURE_LUT,
+}
+
+_WORD_TYPES = frozenset({DataType.UINT16_LE, DataType.INT16_LE, DataType.TEMP16})
+_SCALED_TYPES = frozenset({
+    DataType.UINT8, DataType.INT8, DataType.UINT16_LE, DataType.INT16_LE,
+    DataType.DATA1C, DataType.DATA1B, DataType.TEMP16, DataType.PRESSURE, DataType.BCD,
+})
+
+
+def _field_parts(fd: "FieldDefinition") -> tuple:
+    """
+    Describe one field's decode as source fragments over ``data`` (``n`` is its
+    length): (bytes needed, setup statements, invalid condition or None, value).
+    """
+    data_type, o = fd.data_type, fd.offset
+    factor, offset_value = float(fd.factor), float(fd.offset_value)
+    setup: List[str] = []
+    invalid = None
+
+    if data_type in _WORD_TYPES:
+        signed = data_type != DataType.UINT16_LE
+        setup.append(f"raw = {'_S16' if signed else '_U16'}(data, {o})[0]")
+        if fd.ignore_invalid:
+            if signed:
+                invalid = f"raw == {INVALID_INT16} or raw == -32768 or raw == 32767"
+            else:
+                invalid = f"raw == {INVALID_UINT16}"
+        value = "round(raw * 0.00390625, 1)" if data_type == DataType.TEMP16 else "raw"
+        return o + 2, setup, invalid, _scaled(data_type, value, factor, offset_value)
+
+    if data_type == DataType.BIT:
+        return o + 1, setup, None, f"bool((data[{o}] >> {fd.bit_position}) & 1)"
+    if data_type == DataType.BYTES:
+        return o + 1, setup, None, f"data[{o}:min({o + fd.length}, n)].hex()"
+
+    if data_type == DataType.BCD:
+        setup.append(f"raw = _BCD_LUT[data[{o}]]")
+        invalid = "raw == 0xFF"  # Invalid BCD
+        value = "raw"
+    else:
+        setup.append(f"raw = data[{o}]")
+        if fd.ignore_invalid:
+            invalid = f"raw == {INVALID_UINT8}"
+        value = {
+            DataType.UINT8: "raw",
+            DataType.INT8: "(raw - 256 if raw & 0x80 else raw)",
+            DataType.DATA1C: "_DATA1C_LUT[raw]",
+            DataType.DATA1B: "(raw - 256 if raw & 0x80 else raw) * 0.5",
+            DataType.PRESSURE: "_PRESSURE_LUT[raw]",
+        }[data_type]
+    return o + 1, setup, invalid, _scaled(data_type, value, factor, offset_value)
+
+
+def _scaled(data_type: DataType, value: str, factor: float, offset_value: float) -> str:
+    # Apply factor and offset
+    if data_type in _SCALED_TYPES and (factor != 1.0 or offset_value != 0.0):
+        return f"round(({value}) * {factor!r} + {offset_value!r}, 1)"
+    return value
+
+
+def _decode_key(fd: "FieldDefinition") -> tuple:
+    return (fd.data_type, fd.offset, fd.length, fd.bit_position,
+            float(fd.factor), float(fd.offset_value), bool(fd.ignore_invalid))
+
+
+def _exec_decoder(source: str, filename: str) -> Callable:
+    namespace = dict(_DECODER_GLOBALS)
+    # Source is assembled from field definitions in this module, never from bus data
+    exec(compile(source, filename, "exec"), namespace)  # pylint: disable=exec-used
+    return namespace["decode"]
+
+
+def _compile_decoder(fd: "FieldDefinition") -> Callable[[bytes], Any]:
+    key = _decode_key(fd)
+    decoder = _DECODER_CACHE.get(key)
+    if decoder is None:
+        need, setup, invalid, value = _field_parts(fd)
+        lines = ["def decode(data):", "    n = len(data)", f"    if n < {need}: return None"]
+        lines += [f"    {stmt}" for stmt in setup]
+        if invalid:
+            lines.append(f"    if {invalid}: return None")
+        lines.append(f"    return {value}")
+        source = "\n".join(lines)
+        filename = f"<decoder {fd.data_type.name}@{fd.offset}>"
+        decoder = _DECODER_CACHE[key] = _exec_decoder(source, filename)
+    return decoder
+
+
+def _compile_fields_decoder(fields: List["FieldDefinition"],
+                            label: str) -> Callable[[bytes, Dict[str, str]], Dict[str, Any]]:
+    """
+    Generate one function decoding every field of a message direction. It returns
+    the non-None values by field name and records units for them in ``units``.
+    """
+    lines = ["def decode(data, units):", "    n = len(data)", "    out = {}"]
+    for fd in fields:
+        need, setup, invalid, value = _field_parts(fd)
+        indent = "        "
+        lines.append(f"    if n >= {need}:")
+        lines += [indent + stmt for stmt in setup]
+        if invalid:
+            lines.append(f"{indent}if not ({invalid}):")
+            indent += "    "
+        lines.append(f"{indent}out[{fd.name!r}] = {value}")
+        if fd.unit:
+            lines.append(f"{indent}units[{fd.name!r}] = {fd.unit!r}")
+    lines.append("    return out")
+    return _exec_decoder("\n".join(lines), f"<decoder {label}>")
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class FieldDefinition:
     name: str
     offset: int
@@ -39,98 +177,17 @@ class FieldDefinition:
     factor: float = 1.0
     offset_value: float = 0.0
     ignore_invalid: bool = True  # Filter 0xFF values
+    _decode: Callable[[bytes], Any] = field(init=False, repr=False, compare=False)
 
-    def decode(self, data: bytes) -> Any:
-        if self.offset >= len(data):
-            return None
-
-        try:
-            raw_byte = data[self.offset]
-
-            if self.data_type == DataType.UINT8:
-                if self.ignore_invalid and raw_byte == INVALID_UINT8:
-                    return None
-                value = raw_byte
-
-            elif self.data_type == DataType.INT8:
-                if self.ignore_invalid and raw_byte == INVALID_UINT8:
-                    return None
-                value = int.from_bytes([raw_byte], 'little', signed=True)
-
-            elif self.data_type == DataType.UINT16_LE:
-                if self.offset + 2 > len(data):
-                    return None
-                raw = int.from_bytes(data[self.offset:self.offset+2], 'little')
-                if self.ignore_invalid and raw == INVALID_UINT16:
-                    return None
-                value = raw
-
-            elif self.data_type == DataType.INT16_LE:
-                if self.offset + 2 > len(data):
-                    return None
-                raw = int.from_bytes(data[self.offset:self.offset+2], 'little', signed=True)
-                if self.ignore_invalid and (raw == INVALID_INT16 or raw == -32768 or raw == 32767):
-                    return None
-                value = raw
-
-            elif self.data_type == DataType.DATA1C:
-                # Unsigned byte / 2 - common for temperatures
-                if self.ignore_invalid and raw_byte == INVALID_UINT8:
-                    return None
-                value = round(raw_byte / 2.0, 1)
-
-            elif self.data_type == DataType.DATA1B:
-                # Signed byte / 2
-                if self.ignore_invalid and raw_byte == INVALID_UINT8:
-                    return None
-                raw = int.from_bytes([raw_byte], 'little', signed=True)
-                value = round(raw / 2.0, 1)
-
-            elif self.data_type == DataType.TEMP16:
-                # Signed 16-bit / 256 for precise temps (Used in B504)
-                if self.offset + 2 > len(data):
-                    return None
-                raw = int.from_bytes(data[self.offset:self.offset+2], 'little', signed=True)
-                # Filter invalid values
-                if self.ignore_invalid and (raw == INVALID_INT16 or raw == -32768 or raw == 32767):
-                    return None
-                value = round(raw / 256.0, 1)
-
-            elif self.data_type == DataType.PRESSURE:
-                # Unsigned byte / 10 for bar
-                if self.ignore_invalid and raw_byte == INVALID_UINT8:
-                    return None
-                value = round(raw_byte / 10.0, 1)
-
-            elif self.data_type == DataType.BCD:
-                high = (raw_byte >> 4) & 0x0F
-                low = raw_byte & 0x0F
-                if high > 9 or low > 9:
-                    return None  # Invalid BCD
-                value = high * 10 + low
-
-            elif self.data_type == DataType.BIT:
-                value = bool((raw_byte >> self.bit_position) & 1)
-
-            elif self.data_type == DataType.BYTES:
-                end = min(self.offset + self.length, len(data))
-                value = data[self.offset:end].hex()
-
-            else:
-                value = raw_byte
-
-            # Apply factor and offset (only for valid numeric values)
-            if isinstance(value, (int, float)) and not isinstance(value, bool):
-                if self.factor != 1.0 or self.offset_value != 0.0:
-                    value = round(value * self.factor + self.offset_value, 1)
-
-            return value
+    def __post_init__(self):
+        object.__setattr__(self, "_decode", _compile_decoder(self))
 
-        except Exception:
-            return None
+    def decode(self, data: bytes) -> Any:
+        # Generated decoders bounds-check every read and return None instead
+        return self._decode(data)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class MessageDefinition:
     name: str
     primary_command: int
@@ -138,21 +195,55 @@ class MessageDefinition:
     description: str = ""
     fields: List[FieldDefinition] = field(default_factory=list)
     response_fields: List[FieldDefinition] = field(default_factory=list)
+    # (query, response) generated decoders, built by compile()
+    _decoders: tuple = field(default=(None, None), init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.compile()
 
     @property
     def command(self) -> tuple:
         return (self.primary_command, self.secondary_command)
 
+    def compile(self) -> None:
+        """Generate the query and response decoders for the current field lists."""
+        label = f"{self.primary_command:02X}{self.secondary_command:02X}"
+        self._decoders = (
+            _compile_fields_decoder(self.fields, f"{label} query"),
+            _compile_fields_decoder(self.response_fields, f"{label} response"),
+        )
+
+    def decode_query(self, data: bytes, units: Dict[str, str]) -> Dict[str, Any]:
+        """Decode the query fields present in ``data``, adding their units to ``units``."""
+        return self._decoders[0](data, units)
+
+    def decode_response(self, data: bytes, units: Dict[str, str]) -> Dict[str, Any]:
+        """Decode the response fields present in ``data``, adding their units to ``units``."""
+        return self._decoders[1](data, units)
+
 
 THELIA_MESSAGES: Dict[tuple, MessageDefinition] = {}
 
+# Flat lookup indexed by (primary << 8) | secondary, filled by register_message
+# alongside THELIA_MESSAGES so lookups avoid building and hashing a tuple key.
+_CMD_TABLE: List[Optional[MessageDefinition]] = [None] * 0x10000
+
 
 def register_message(msg: MessageDefinition) -> MessageDefinition:
+    # Interned so consumers can compare message names by identity.
+    msg.name = sys.intern(msg.name)
     THELIA_MESSAGES[msg.command] = msg
+    _CMD_TABLE[(msg.primary_command << 8) | msg.secondary_command] = msg
     return msg
 
 
 def get_message_definition(primary: int, secondary: int) -> Optional[MessageDefinition]:
+    # Byte-range commands hit the flat table; anything else, and entries written
+    # straight into THELIA_MESSAGES, fall back to the dict.
+    if not (primary | secondary) >> 8:
+        msg = _CMD_TABLE[(primary << 8) | secondary]
+        if msg is not None:
+            return msg
     return THELIA_MESSAGES.get((primary, secondary))
 
 
@@ -1,10 +1,28 @@
 import json
 import logging
+import selectors
 import time
+import zlib
 from typing import Any, Dict, Optional, Tuple
 
 import paho.mqtt.client as mqtt
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to compact stdlib JSON.
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# Spacing of main-loop connection attempts, doubling after each one until CONNACK.
+RECONNECT_MIN_DELAY_SECONDS = 5.0
+RECONNECT_MAX_DELAY_SECONDS = 30.0
+MQTT_CONNECT_TIMEOUT_SECONDS = 2.0
+
+# How long after CONNACK to wait for the retained discovery epoch before assuming it is missing.
+DISCOVERY_EPOCH_GRACE_SECONDS = 2.0
+
 
 class HAMqttClient:
     def __init__(self, broker: str, port: int, username: str = None, password: str = None):
@@ -17,15 +35,18 @@ class HAMqttClient:
         self.connected = False
         self.discovery_sent = False
         self._discovered_entities = set()
-        self._loop_started = False
         self._ever_connected = False
         self._last_connect_attempt_monotonic = 0.0
+        self._reconnect_delay = RECONNECT_MIN_DELAY_SECONDS
         self._last_restart_monotonic = 0.0
         self._last_publish_attempt_monotonic: Optional[float] = None
         self._last_successful_publish_monotonic: Optional[float] = None
         self._consecutive_publish_failures = 0
         self._heartbeat_topic = "ebus/thelia/bridge_heartbeat"
         self._status_topic = "ebus/thelia/status"
+        self._discovery_epoch_topic = "ebus/thelia/_discovery_epoch"
+        # Set on connect: discovery waits for the retained epoch until this passes.
+        self._discovery_epoch_deadline: Optional[float] = None
         self.client = self._create_client()
 
         self.entity_map = {
@@ -233,16 +254,22 @@ class HAMqttClient:
                 "icon": "mdi:water-sync",
             },
         }
+        self._discovery_epoch = self._compute_discovery_epoch()
 
     def _create_client(self):
         # paho-mqtt >=2.0 requires explicit callback API version.
-        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, "ebus_thelia_bridge")
+        # A persistent session keeps our subscription alive across reconnects.
+        client = mqtt.Client(
+            mqtt.CallbackAPIVersion.VERSION2, "ebus_thelia_bridge", clean_session=False
+        )
         if self.username and self.password:
             client.username_pw_set(self.username, self.password)
 
         client.on_connect = self._on_connect
         client.on_disconnect = self._on_disconnect
-        client.reconnect_delay_set(min_delay=1, max_delay=30)
+        client.on_message = self._on_message
+        # reconnect() blocks the main loop, so keep an unreachable broker from stalling it for long.
+        client.connect_timeout = MQTT_CONNECT_TIMEOUT_SECONDS
         client.will_set(self._status_topic, "offline", retain=True)
         client.enable_logger(self.logger)
         return client
@@ -309,6 +336,14 @@ class HAMqttClient:
 
         return component, clean_id, payload
 
+    def _compute_discovery_epoch(self) -> str:
+        """Fingerprint of the static discovery configs, kept retained on the broker."""
+        payloads = [
+            self._build_discovery_payload(sensor_key, config)
+            for sensor_key, config in sorted(self.entity_map.items())
+        ]
+        return str(zlib.crc32(json.dumps(payloads, sort_keys=True).encode("utf-8")))
+
     def _publish_result_ok(
         self,
         result,
@@ -333,8 +368,16 @@ class HAMqttClient:
             return False
 
         if wait_for_publish:
+            # There is no paho network thread, so pump the socket ourselves until the ack lands.
+            deadline = time.monotonic() + timeout_s
             try:
-                result.wait_for_publish(timeout=timeout_s)
+                while not result.is_published() and self.client.socket() is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.poll(min(remaining, 0.1))
+                # Raises for queue-full / not-connected results.
+                result.wait_for_publish(timeout=0)
             except Exception as e:
                 self._consecutive_publish_failures += 1
                 self.logger.warning("MQTT %s wait_for_publish failed for %s: %s", context, topic, e)
@@ -364,21 +407,22 @@ class HAMqttClient:
 
         self.connected = False
         now = time.monotonic()
-        if (now - self._last_connect_attempt_monotonic) < 5.0:
+        if (now - self._last_connect_attempt_monotonic) < self._reconnect_delay:
             return False
 
+        # paho only backs off inside its own network thread, so do it here. Each attempt
+        # blocks the loop for up to connect_timeout; the serial driver buffers meanwhile.
+        if self._last_connect_attempt_monotonic:
+            self._reconnect_delay = min(self._reconnect_delay * 2, RECONNECT_MAX_DELAY_SECONDS)
         self._last_connect_attempt_monotonic = now
 
         try:
             if self._ever_connected:
                 self.logger.warning("Requesting MQTT reconnect (%s)", reason)
-                self.client.reconnect()
             else:
                 self.logger.warning("Requesting initial MQTT connection (%s)", reason)
-                if not self._loop_started:
-                    self.client.loop_start()
-                    self._loop_started = True
                 self.client.connect_async(self.broker, self.port, 60)
+            self.client.reconnect()
         except Exception as e:
             self.logger.warning("MQTT connection request failed during %s: %s", reason, e)
             return False
@@ -399,16 +443,9 @@ class HAMqttClient:
         except Exception as e:
             self.logger.warning("MQTT disconnect during restart failed: %s", e)
 
-        try:
-            if self._loop_started:
-                old_client.loop_stop()
-        except Exception as e:
-            self.logger.warning("MQTT loop_stop during restart failed: %s", e)
-
         self.connected = False
         self.discovery_sent = False
         self._discovered_entities.clear()
-        self._loop_started = False
         self._ever_connected = False
         self.client = self._create_client()
         self.connect()
@@ -441,7 +478,7 @@ class HAMqttClient:
         disc_topic = f"homeassistant/{component}/ebus_thelia/{clean_id}/config"
         if not self._publish_message(
             disc_topic,
-            json.dumps(payload),
+            _dumps(payload),
             retain=True,
             context=f"discovery:{sensor_key}",
         ):
@@ -494,15 +531,53 @@ class HAMqttClient:
 
     def connect(self):
         try:
-            if not self._loop_started:
-                self.client.loop_start()
-                self._loop_started = True
-            self._last_connect_attempt_monotonic = time.monotonic()
             self.client.connect_async(self.broker, self.port, 60)
-            self.logger.info(f"Starting MQTT connection loop for {self.broker}:{self.port}...")
+            self.logger.info(f"Connecting to MQTT broker {self.broker}:{self.port}...")
+            # The socket is opened by ensure_connection() on the next poll() or publish.
+            self._last_connect_attempt_monotonic = 0.0
+            self._reconnect_delay = RECONNECT_MIN_DELAY_SECONDS
         except Exception as e:
             self.logger.error(f"Failed to connect to MQTT: {e}")
 
+    def poll(self, timeout: float) -> None:
+        """Drive the MQTT socket from the caller's loop instead of a paho thread.
+
+        Runs paho's read, write and keepalive steps for ``timeout`` seconds, so
+        the caller keeps a fixed cycle period. Without a socket it requests a
+        (backed-off) connection and sleeps.
+        """
+        sock = self.client.socket()
+        if sock is None:
+            self.ensure_connection("poll")
+            time.sleep(timeout)
+            return
+
+        deadline = time.monotonic() + timeout
+        remaining = timeout
+        with selectors.DefaultSelector() as selector:
+            key = selector.register(sock, selectors.EVENT_READ)
+            while remaining > 0:
+                events = selectors.EVENT_READ
+                if self.client.want_write():
+                    events |= selectors.EVENT_WRITE
+                if events != key.events:
+                    key = selector.modify(sock, events)
+
+                for _, mask in selector.select(remaining):
+                    if mask & selectors.EVENT_READ:
+                        self.client.loop_read()
+                    if mask & selectors.EVENT_WRITE:
+                        self.client.loop_write()
+                self.client.loop_misc()
+
+                remaining = deadline - time.monotonic()
+                if self.client.socket() is not sock:
+                    # Dropped or replaced mid-poll; pick it up on the next call.
+                    break
+
+        if remaining > 0:
+            time.sleep(remaining)
+
     # paho-mqtt 2.0 callback signature includes "properties".
     def _on_connect(self, client, userdata, flags, rc, properties=None):
         rc_value = self._reason_code_value(rc)
@@ -510,8 +585,11 @@ class HAMqttClient:
             self.logger.info("Connected to MQTT Broker")
             self.connected = True
             self._ever_connected = True
+            self._last_connect_attempt_monotonic = 0.0
+            self._reconnect_delay = RECONNECT_MIN_DELAY_SECONDS
             self.discovery_sent = False
             self._discovered_entities.clear()
+            self._discovery_epoch_deadline = time.monotonic() + DISCOVERY_EPOCH_GRACE_SECONDS
             self._publish_message(
                 self._status_topic,
                 "online",
@@ -519,6 +597,14 @@ class HAMqttClient:
                 qos=1,
                 context="availability-online",
             )
+            # The retained epoch tells us whether the broker already holds
+            # the current discovery configs.
+            try:
+                self.client.subscribe(self._discovery_epoch_topic, qos=1)
+            except Exception as e:
+                self.logger.warning(
+                    "MQTT subscribe to %s failed: %s", self._discovery_epoch_topic, e
+                )
         else:
             self.logger.error(f"Failed to connect, return code {rc}")
 
@@ -532,6 +618,17 @@ class HAMqttClient:
         else:
             self.logger.warning(f"MQTT disconnected unexpectedly, return code {rc}")
 
+    def _on_message(self, _client, _userdata, message):
+        if message.topic != self._discovery_epoch_topic:
+            return
+
+        self._discovery_epoch_deadline = None
+        epoch = message.payload.decode("utf-8", errors="replace").strip()
+        if epoch == self._discovery_epoch and not self.discovery_sent:
+            self.logger.info("Broker already holds current discovery config, skipping re-publish")
+            self._discovered_entities.update(self.entity_map)
+            self.discovery_sent = True
+
     def publish_discovery(self):
         """Send discovery config so Home Assistant can auto-create entities."""
         if not self.connected:
@@ -542,9 +639,30 @@ class HAMqttClient:
             if not self._publish_discovery_for_sensor(sensor_key, config):
                 return False
 
+        if not self._publish_message(
+            self._discovery_epoch_topic,
+            self._discovery_epoch,
+            retain=True,
+            qos=1,
+            context="discovery-epoch",
+        ):
+            return False
+
         self.discovery_sent = True
         return True
 
+    def _ensure_discovery(self) -> bool:
+        """Publish discovery unless the broker's retained epoch may still say it is current."""
+        deadline = self._discovery_epoch_deadline
+        if deadline is not None and time.monotonic() < deadline:
+            # Still waiting for the retained epoch; the caller retries on its next cycle.
+            return False
+        self._discovery_epoch_deadline = None
+        if not self.publish_discovery():
+            self.restart("discovery publish failed")
+            return False
+        return True
+
     def publish_sensors(self, sensors: Dict[str, Dict]):
         """Publish sensor values to MQTT, with dynamic HA discovery for new keys."""
         if not sensors:
@@ -553,10 +671,8 @@ class HAMqttClient:
         if not self.ensure_connection("sensor publish"):
             return False
 
-        if not self.discovery_sent:
-            if not self.publish_discovery():
-                self.restart("discovery publish failed")
-                return False
+        if not self.discovery_sent and not self._ensure_discovery():
+            return False
 
         for key, data in sensors.items():
             if not isinstance(data, dict) or "value" not in data:
@@ -603,7 +719,7 @@ class HAMqttClient:
         return max(0.0, current - self._last_successful_publish_monotonic)
 
     def disconnect(self):
-        """Disconnect from MQTT broker and stop background loop."""
+        """Disconnect from MQTT broker."""
         try:
             if self.connected:
                 self._publish_message(
@@ -617,7 +733,4 @@ class HAMqttClient:
         except Exception as e:
             self.logger.warning(f"Failed to disconnect MQTT cleanly: {e}")
         finally:
-            if self._loop_started:
-                self.client.loop_stop()
-                self._loop_started = False
             self.connected = False
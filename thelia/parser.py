@@ -4,6 +4,8 @@ Thelia boiler parser and sensor aggregator.
 
 import logging
 import json
+import struct
+import sys
 from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -12,6 +14,10 @@ from pathlib import Path
 from ebus_core.telegram import EbusTelegram
 from .messages import MessageDefinition, get_message_definition
 
+UNKNOWN_MESSAGE = sys.intern("unknown")
+
+_unpack_s16 = struct.Struct("<h").unpack_from
+
 EBUS_ADDRESSES = {
     0x00: "broadcast_0",
     0x08: "boiler",
@@ -61,21 +67,35 @@ class ParsedMessage:
         return self.query_data.get(key, default)
 
 
+def _no_callbacks(_message: ParsedMessage) -> None:
+    pass
+
+
 class TheliaParser:
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
-        self._callbacks: List[Callable[[ParsedMessage], None]] = []
+        # All registered callbacks, fused into one callable at registration time
+        self._fire: Callable[[ParsedMessage], None] = _no_callbacks
         self.stats = {"total": 0, "parsed": 0, "unknown": 0}
 
     def register_callback(self, callback: Callable[[ParsedMessage], None]) -> None:
-        self._callbacks.append(callback)
+        logger = self.logger
 
-    def _notify(self, message: ParsedMessage) -> None:
-        for cb in self._callbacks:
+        def guarded(message: ParsedMessage) -> None:
             try:
-                cb(message)
+                callback(message)
             except Exception as e:
-                self.logger.error(f"Callback error: {e}")
+                logger.error(f"Callback error: {e}")
+
+        if self._fire is _no_callbacks:
+            self._fire = guarded
+            return
+
+        def fired(message: ParsedMessage, _prev=self._fire, _new=guarded) -> None:
+            _prev(message)
+            _new(message)
+
+        self._fire = fired
 
     def parse(self, telegram: EbusTelegram) -> ParsedMessage:
         self.stats["total"] += 1
@@ -90,7 +110,7 @@ class TheliaParser:
             self.stats["unknown"] += 1
             raw_resp = telegram.response_data.hex() if telegram.response_data else ""
             msg = ParsedMessage(
-                name="unknown",
+                name=UNKNOWN_MESSAGE,
                 timestamp=ts,
                 source=telegram.source,
                 destination=telegram.destination,
@@ -101,29 +121,15 @@ class TheliaParser:
                 response_data={"raw": raw_resp} if raw_resp else {},
                 raw_telegram=telegram,
             )
-            self._notify(msg)
+            self._fire(msg)
             return msg
 
-        query_values = {}
-        response_values = {}
         units = {}
 
-        # Decode Query Fields
-        for field_def in msg_def.fields:
-            value = field_def.decode(telegram.data)
-            if value is not None:
-                query_values[field_def.name] = value
-                if field_def.unit:
-                    units[field_def.name] = field_def.unit
-
-        # Decode Response Fields
-        if telegram.response_data and msg_def.response_fields:
-            for field_def in msg_def.response_fields:
-                value = field_def.decode(telegram.response_data)
-                if value is not None:
-                    response_values[field_def.name] = value
-                    if field_def.unit:
-                        units[field_def.name] = field_def.unit
+        # Decode Query and Response Fields
+        query_values = msg_def.decode_query(telegram.data, units)
+        data = telegram.response_data
+        response_values = msg_def.decode_response(data, units) if data else {}
 
         self.stats["parsed"] += 1
 
@@ -141,7 +147,7 @@ class TheliaParser:
             raw_telegram=telegram,
         )
 
-        self._notify(msg)
+        self._fire(msg)
         return msg
 
     def get_stats(self) -> Dict[str, int]:
@@ -551,7 +557,7 @@ class DataAggregator:
 
             # Confirmed via debug dump: Bytes 8-9 contain outdoor temp
             if len(resp) >= 10:
-                val = int.from_bytes(resp[8:10], 'little', signed=True) / 256.0
+                val = _unpack_s16(resp, 8)[0] / 256.0
                 self._set_sensor("boiler.outdoor_temperature", round(val, 1), "Â°C", ts,
                                "Outdoor Temp", min_v=-40.0, max_v=50.0)
 
@@ -574,7 +580,9 @@ class DataAggregator:
                    persistent: bool = False) -> None:
 
         # Apply Sanity Checks
-        if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Alert rules treat bools as numeric; the sanity bounds do not
+        numeric = isinstance(value, (int, float))
+        if numeric and not isinstance(value, bool):
             if min_v is not None and value < min_v:
                 return
             if max_v is not None and value > max_v:
@@ -586,6 +594,7 @@ class DataAggregator:
             "timestamp": timestamp,
             "description": description,
             "persistent": bool(persistent),
+            "numeric": numeric,
         }
 
     def get_sensor(self, name: str) -> Optional[Any]:
@@ -600,9 +609,9 @@ class DataAggregator:
         return data["value"]
 
     def get_all_sensors(self) -> Dict[str, Dict]:
-        self._publish_runtime_metrics(datetime.now())
-        result = {}
         now = datetime.now()
+        self._publish_runtime_metrics(now)
+        result = {}
         for name, data in self._sensors.items():
             age = (now - data["timestamp"]).total_seconds()
             if age <= self.max_age or data.get("persistent"):
@@ -611,6 +620,7 @@ class DataAggregator:
                     "unit": data["unit"],
                     "age_seconds": round(age, 1),
                     "description": data.get("description", ""),
+                    "numeric": data["numeric"],
                 }
         return result
 
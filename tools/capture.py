@@ -62,7 +62,7 @@ class EbusCapturer:
             if out_file:
                 out_file.write(data)
             ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            hex_str = ' '.join(f'{b:02X}' for b in data)
+            hex_str = data.hex(' ').upper()
             print(f"[{ts}] {hex_str}")
 
         self.connection.register_raw_callback(on_raw)